@@ -0,0 +1,167 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from covid_simulation import CovidSimulation
+from game_of_life_1d import GameOfLife1D
+from game_of_life_2d import GameOfLife2D
+from random_generators import RandomGenerators
+
+# Offline benchmark of every model step and sampler over a ladder of sizes.
+#
+#   python benchmark.py                       # run, save bench_results/<commit>.json
+#   python benchmark.py --save-baseline       # also store it as the baseline
+#   python benchmark.py --quick --max-grid 512 --max-samples 1000000
+#
+# A case regresses when its throughput drops more than --threshold below
+# the baseline for the same name and size.
+
+GRID_SIZES = [64, 128, 256, 512, 1024, 2048, 4096]
+SAMPLE_SIZES = [10**3, 10**4, 10**5, 10**6, 10**7, 10**8]
+
+SAMPLERS = {
+    'uniform': {},
+    'exponential': {'lam': 1.0},
+    'erlang': {'k': 3, 'lam': 1.0},
+    'gamma': {'shape': 2.5},
+    'normal': {},
+    'weibull': {'k': 1.5},
+    'bernoulli': {'p': 0.3},
+    'binomial': {'n': 1000, 'p': 0.3},
+    'poisson': {'lam': 50.0},
+}
+
+def _gol2d(n):
+    model = GameOfLife2D(n, n)
+    model.randomize(0.3, seed=0)
+    return model.step, n * n
+
+def _gol1d(n):
+    model = GameOfLife1D(n * n, rule=30)
+    model.reset(np.random.default_rng(0).integers(0, 2, n * n))
+    return model.step, n * n
+
+def _covid(n):
+    model = CovidSimulation(n, n, init_infected=max(1, n * n // 100), seed=0)
+    return model.step, n * n
+
+def _sampler(name):
+    def setup(size):
+        rng = np.random.default_rng(0)
+        fn = getattr(RandomGenerators, name)
+        params = SAMPLERS[name]
+        return (lambda: fn(size=size, rng=rng, **params)), size
+    return setup
+
+def cases(max_grid, max_samples):
+    out = []
+    for n in [g for g in GRID_SIZES if g <= max_grid]:
+        out.append(('GameOfLife2D.step', n, 'cells', _gol2d))
+        out.append(('GameOfLife1D.step', n, 'cells', _gol1d))
+        out.append(('CovidSimulation.step', n, 'cells', _covid))
+    for name in SAMPLERS:
+        for size in [s for s in SAMPLE_SIZES if s <= max_samples]:
+            out.append((f'RandomGenerators.{name}', size, 'samples', _sampler(name)))
+    return out
+
+def measure(setup, size, min_time, max_repeats):
+    # Best-of timing of a single call; peak memory is what tracemalloc sees
+    # allocated (numpy included) during one call beyond the setup.
+    fn, units = setup(size)
+    fn()
+    times = []
+    start = time.perf_counter()
+    while len(times) < max_repeats and (not times or time.perf_counter() - start < min_time):
+        t = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t)
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    fn()
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    best = min(times)
+    return {'seconds': best, 'throughput': units / best, 'peak_bytes': peak, 'repeats': len(times)}
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def compare(results, baseline, threshold):
+    base = {(r['name'], r['size']): r for r in baseline['results']}
+    regressions = []
+    for r in results:
+        b = base.get((r['name'], r['size']))
+        if b is None:
+            continue
+        ratio = r['throughput'] / b['throughput']
+        r['baseline_ratio'] = ratio
+        if ratio < 1 - threshold:
+            regressions.append(r)
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark de los modelos y generadores.')
+    parser.add_argument('--max-grid', type=int, default=4096)
+    parser.add_argument('--max-samples', type=int, default=10**8)
+    parser.add_argument('--only', default=None, help='solo casos cuyo nombre contiene este texto')
+    parser.add_argument('--min-time', type=float, default=0.5, help='segundos mínimos por caso')
+    parser.add_argument('--repeats', type=int, default=20, help='repeticiones máximas por caso')
+    parser.add_argument('--quick', action='store_true', help='una sola repetición por caso')
+    parser.add_argument('--out-dir', default='bench_results')
+    parser.add_argument('--baseline', default=None, help='JSON de referencia (por defecto <out-dir>/baseline.json)')
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--threshold', type=float, default=0.2)
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.repeats = 1
+
+    commit = git_commit()
+    results = []
+    for name, size, unit, setup in cases(args.max_grid, args.max_samples):
+        if args.only and args.only not in name:
+            continue
+        r = measure(setup, size, args.min_time, args.repeats)
+        r.update(name=name, size=size, unit=unit)
+        results.append(r)
+        print(f'{name:32s} {size:>10d}  {r["seconds"] * 1e3:10.3f} ms  '
+              f'{r["throughput"]:12.4g} {unit}/s  {r["peak_bytes"] / 2**20:9.1f} MiB', flush=True)
+
+    report = {'commit': commit, 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+              'python': sys.version.split()[0], 'numpy': np.__version__,
+              'machine': platform.platform(), 'results': results}
+    os.makedirs(args.out_dir, exist_ok=True)
+    path = os.path.join(args.out_dir, f'{commit}.json')
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=1)
+    print(f'Resultados guardados en {path}')
+
+    baseline_path = args.baseline or os.path.join(args.out_dir, 'baseline.json')
+    status = 0
+    if os.path.exists(baseline_path) and not args.save_baseline:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for r in regressions:
+            print(f'REGRESIÓN {r["name"]} size={r["size"]}: {r["baseline_ratio"]:.2f}x del baseline '
+                  f'({baseline["commit"]})')
+        status = 1 if regressions else 0
+    if args.save_baseline:
+        with open(baseline_path, 'w') as f:
+            json.dump(report, f, indent=1)
+        print(f'Baseline guardado en {baseline_path}')
+    return status
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
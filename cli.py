@@ -0,0 +1,224 @@
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from instrumentation import Metrics
+from random_generators import SAMPLERS
+from storage import ArrayWriter, save_array
+
+# Headless entry point: runs the models without tkinter or matplotlib.
+#
+#   python cli.py gol2d --rows 1000 --cols 1000 --steps 500 --seed 1 --out runs/gol
+#   python cli.py sample gamma --size 100000000 --param shape=2 --out runs/gamma
+#   python cli.py covid --steps 500 --metrics runs/covid_metrics.csv --profile 50
+
+def _parse_params(items):
+    params = {}
+    for item in items or []:
+        key, _, value = item.partition('=')
+        try:
+            params[key] = int(value)
+        except ValueError:
+            params[key] = float(value)
+    return params
+
+def _report(name, seconds, units, unit_name, out, **extra):
+    rate = units / seconds if seconds > 0 else float('inf')
+    print(json.dumps({'model': name, 'seconds': round(seconds, 6),
+                      unit_name: units, f'{unit_name}_per_second': rate, 'out': out, **extra}))
+
+def _elementary_rule(text):
+    rule = int(text)
+    if not 0 <= rule <= 255:
+        raise argparse.ArgumentTypeError(f'la regla debe estar entre 0 y 255: {rule}')
+    return rule
+
+def _cycle_window(args):
+    return args.cycle_window if args.until_steady else None
+
+def run_gol1d(args):
+    from game_of_life_1d import GameOfLife1D, PackedGameOfLife1D
+    cls = PackedGameOfLife1D if args.packed else GameOfLife1D
+    model = cls(length=args.length, rule=args.rule, cycle_window=_cycle_window(args))
+    if args.density is not None:
+        model.reset(np.random.default_rng(args.seed).random(args.length) < args.density)
+    meta = dict(model='gol1d', length=args.length, rule=args.rule, seed=args.seed, density=args.density)
+    start = time.perf_counter()
+    writer = ArrayWriter(args.out, (args.length,), np.uint8, **meta) if args.out else None
+    if writer:
+        writer.append(model.state)
+    done = 0
+    while done < args.steps:
+        n = min(args.block, args.steps - done)
+        with args.timings.timer('run'):
+            diagram = model.run(n)
+        steady = model.steady_state()
+        if steady is not None:
+            # Trim the block where the steady state is first recognised.
+            n = steady['since'] - done + (0 if steady['kind'] == 'extinct' else steady['period'])
+            diagram = diagram[:n + 1]
+        if writer:
+            with args.timings.timer('write'):
+                writer.append(diagram[1:])
+        done += n
+        if steady is not None:
+            break
+    if writer:
+        writer.close()
+    _report('gol1d', time.perf_counter() - start, args.length * done, 'cells', args.out,
+            steps=done, steady=model.steady_state())
+
+def run_gol2d(args):
+    from game_of_life_2d import GameOfLife2D
+    model = GameOfLife2D(rows=args.rows, cols=args.cols, boundary=args.boundary, tile_size=args.tile_size, rule=args.rule,
+                         cycle_window=_cycle_window(args))
+    model.randomize(p=args.density, seed=args.seed)
+    meta = dict(model='gol2d', rows=args.rows, cols=args.cols, boundary=args.boundary, rule=args.rule,
+                density=args.density, seed=args.seed, every=args.every)
+    start = time.perf_counter()
+    writer = ArrayWriter(args.out, (args.rows, args.cols), np.uint8, **meta) if args.out and args.every else None
+    if writer:
+        writer.append(model.grid)
+    done = 0
+    for t in range(1, args.steps + 1):
+        with args.timings.timer('step'):
+            model.step()
+        done = t
+        if writer and t % args.every == 0:
+            with args.timings.timer('write'):
+                writer.append(model.grid)
+        if model.steady_state() is not None:
+            break
+    if writer:
+        writer.close()
+    elif args.out:
+        save_array(args.out, model.grid[None], **meta)
+    _report('gol2d', time.perf_counter() - start, args.rows * args.cols * done, 'cells', args.out,
+            steps=done, steady=model.steady_state())
+
+def run_covid(args):
+    params = dict(init_infected=args.init_infected, p_infect=args.p_infect, p_recover=args.p_recover,
+                  p_die=args.p_die, seed=args.seed)
+    if args.agents:
+        # Agents move on a cols x rows torus instead of sitting on the lattice.
+        from covid_agents import AgentCovidSimulation
+        model = AgentCovidSimulation(n_agents=args.agents, width=args.cols, height=args.rows,
+                                     radius=args.radius, speed=args.speed, **params)
+        units, unit_name = args.agents, 'agents'
+    else:
+        from covid_simulation import CovidSimulation
+        model = CovidSimulation(rows=args.rows, cols=args.cols, **params)
+        units, unit_name = args.rows * args.cols, 'cells'
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        with args.timings.timer('step'):
+            model.step()
+        if args.until_steady and model.steady_state() is not None:
+            break
+    seconds = time.perf_counter() - start
+    if args.out:
+        meta = dict(model='covid', rows=args.rows, cols=args.cols, agents=args.agents, **params)
+        save_array(args.out + '_history', model.history, **meta)
+        if args.agents:
+            save_array(args.out + '_agents', np.stack([model.x, model.y]), **meta)
+            save_array(args.out + '_state', model.state[None], **meta)
+        else:
+            save_array(args.out + '_grid', model.grid[None], **meta)
+    _report('covid', seconds, units * model.t, unit_name, args.out,
+            steps=model.t, steady=model.steady_state())
+
+def run_sample(args):
+    from sample_stream import iter_chunks
+    params = _parse_params(args.param)
+    start = time.perf_counter()
+    writer = None
+    chunks = iter_chunks(args.dist, args.size, params, chunk_size=args.chunk_size, seed=args.seed)
+    while True:
+        with args.timings.timer('sample'):
+            chunk = next(chunks, None)
+        if chunk is None:
+            break
+        if args.out and writer is None:
+            writer = ArrayWriter(args.out, (), chunk.dtype, dist=args.dist, params=params, seed=args.seed,
+                                 chunk_size=args.chunk_size)
+        if writer:
+            with args.timings.timer('write'):
+                writer.append(chunk)
+    if writer:
+        writer.close()
+    _report(args.dist, time.perf_counter() - start, args.size, 'samples', args.out)
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Ejecución sin interfaz gráfica de los modelos.')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('gol1d', help='Autómata celular elemental')
+    p.add_argument('--length', type=int, default=300)
+    p.add_argument('--rule', type=_elementary_rule, default=30, help='código de Wolfram, 0-255')
+    p.add_argument('--steps', type=int, default=200)
+    p.add_argument('--density', type=float, default=None, help='estado inicial aleatorio (por defecto una celda)')
+    p.add_argument('--packed', action='store_true', help='motor empaquetado en bits')
+    p.add_argument('--block', type=int, default=1024, help='pasos por bloque escrito a disco')
+    p.set_defaults(func=run_gol1d, phase='run')
+
+    p = sub.add_parser('gol2d', help='Juego de la Vida 2D')
+    p.add_argument('--rows', type=int, default=50)
+    p.add_argument('--cols', type=int, default=50)
+    p.add_argument('--density', type=float, default=0.2)
+    p.add_argument('--steps', type=int, default=100)
+    p.add_argument('--boundary', choices=('clip', 'wrap'), default='clip')
+    p.add_argument('--tile-size', type=int, default=None)
+    p.add_argument('--rule', default='B3/S23', help='regla en notación B/S, p. ej. B36/S23')
+    p.add_argument('--every', type=int, default=0, help='guardar un fotograma cada N pasos (0 = solo el final)')
+    p.set_defaults(func=run_gol2d, phase='step')
+
+    p = sub.add_parser('covid', help='Simulación COVID en malla')
+    p.add_argument('--rows', type=int, default=60)
+    p.add_argument('--cols', type=int, default=60)
+    p.add_argument('--init-infected', type=int, default=5)
+    p.add_argument('--p-infect', type=float, default=0.3)
+    p.add_argument('--p-recover', type=float, default=0.02)
+    p.add_argument('--p-die', type=float, default=0.005)
+    p.add_argument('--steps', type=int, default=100)
+    p.add_argument('--agents', type=int, default=0, help='modo de agentes móviles con N agentes (0 = malla)')
+    p.add_argument('--radius', type=float, default=1.5, help='distancia de contacto entre agentes')
+    p.add_argument('--speed', type=float, default=0.5, help='escala del paso aleatorio de cada agente')
+    p.set_defaults(func=run_covid, phase='step')
+
+    p = sub.add_parser('sample', help='Muestras de una distribución de RandomGenerators')
+    p.add_argument('dist', choices=SAMPLERS)
+    p.add_argument('--size', type=int, default=1000)
+    p.add_argument('--param', action='append', help='parámetro clave=valor, repetible')
+    p.add_argument('--chunk-size', type=int, default=1 << 20)
+    p.set_defaults(func=run_sample, phase='sample')
+
+    for name in ('gol1d', 'gol2d', 'covid'):
+        p = sub.choices[name]
+        p.add_argument('--until-steady', action='store_true',
+                       help='parar al llegar a un punto fijo, un ciclo o la extinción')
+        if name != 'covid':
+            p.add_argument('--cycle-window', type=int, default=64, help='estados recordados para detectar ciclos')
+
+    for p in sub.choices.values():
+        p.add_argument('--seed', type=int, default=None)
+        p.add_argument('--out', default=None, help='ruta base de salida (.bin + .json)')
+        p.add_argument('--metrics', dest='metrics_out', default=None,
+                       help='guardar latencias por fase (.json o .csv)')
+        p.add_argument('--profile', type=int, default=0,
+                       help='perfilar con cProfile las primeras N iteraciones (informe en stderr)')
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.timings = Metrics(enabled=bool(args.metrics_out or args.profile))
+    if args.profile:
+        args.timings.profile(args.profile, phase=args.phase, done=lambda report: print(report, file=sys.stderr))
+    args.func(args)
+    if args.metrics_out:
+        args.timings.export(args.metrics_out)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
\ No newline at end of file
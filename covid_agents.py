@@ -0,0 +1,174 @@
+import numpy as np
+
+from ring_buffer import GrowingHistory
+
+def _expand(src, start, stop):
+    # All pairs (src[i], k) for k in range(start[i], stop[i]), vectorized.
+    lens = stop - start
+    total = int(lens.sum())
+    owner = np.repeat(src, lens)
+    pos = np.arange(total) - np.repeat(np.cumsum(lens) - lens - start, lens)
+    return owner, pos
+
+class AgentCovidSimulation:
+    # Agent-based variant of CovidSimulation.  Agents are struct-of-arrays
+    # (x, y, state, infected_at) on a width x height torus and take a
+    # Gaussian random-walk step of scale `speed` every tick.  Contacts are
+    # agents closer than `radius`, found through a cell list of
+    # radius-sized buckets, so a step costs O(agents + contacts) instead of
+    # O(area).  With graph=(indptr, indices), a CSR adjacency (e.g. from
+    # scipy.sparse), contacts come from that fixed graph instead.
+    # States and transition rules are those of CovidSimulation (no empty
+    # state), and counts() / history have the same layout.
+    def __init__(self, n_agents=10000, width=100.0, height=100.0, init_infected=5, p_infect=0.3,
+                 p_recover=0.02, p_die=0.005, radius=1.5, speed=0.5, graph=None, seed=None):
+        if radius <= 0:
+            raise ValueError('radius must be > 0')
+        self.n = int(n_agents)
+        self.width = float(width)
+        self.height = float(height)
+        self.p_infect = p_infect
+        self.p_recover = p_recover
+        self.p_die = p_die
+        self.radius = radius
+        self.speed = speed
+        self.t = 0
+        self.rng = np.random.default_rng(seed)
+        self.x = self.rng.random(self.n, dtype=np.float32) * np.float32(self.width)
+        self.y = self.rng.random(self.n, dtype=np.float32) * np.float32(self.height)
+        self.state = np.ones(self.n, dtype=np.uint8)
+        self.infected_at = np.full(self.n, -1, dtype=np.int32)
+        if graph is not None:
+            indptr, indices = graph
+            self.graph = (np.asarray(indptr, dtype=np.int64), np.asarray(indices, dtype=np.int64))
+            if len(self.graph[0]) != self.n + 1:
+                raise ValueError('graph indptr must have n_agents + 1 entries')
+        else:
+            self.graph = None
+        # Cell list geometry: at least radius per cell, and with fewer than
+        # three cells along an axis every cell on it is scanned once.
+        self.nx = max(1, int(self.width // radius))
+        self.ny = max(1, int(self.height // radius))
+        self._offsets = [(dx, dy) for dx in self._axis_offsets(self.nx) for dy in self._axis_offsets(self.ny)]
+        first = self.rng.choice(self.n, size=min(init_infected, self.n), replace=False)
+        self.state[first] = 2
+        self.infected_at[first] = 0
+        self._history = GrowingHistory(5)
+        self.recount()
+
+    @staticmethod
+    def _axis_offsets(n):
+        return (-1, 0, 1) if n >= 3 else tuple(range(n))
+
+    def move(self):
+        # Dead agents stay where they are.
+        if not self.speed:
+            return
+        alive = self.state != 4
+        for pos, size in ((self.x, self.width), (self.y, self.height)):
+            d = self.rng.standard_normal(self.n, dtype=np.float32)
+            d *= np.float32(self.speed)
+            d *= alive
+            pos += d
+            np.mod(pos, np.float32(size), out=pos)
+            # float32 rounding can land exactly on size.
+            pos[pos >= size] = 0
+
+    def _cells(self, idx):
+        cx = np.minimum((self.x[idx] * (self.nx / self.width)).astype(np.int64), self.nx - 1)
+        cy = np.minimum((self.y[idx] * (self.ny / self.height)).astype(np.int64), self.ny - 1)
+        return cx, cy
+
+    def _spatial_contacts(self, src, dst):
+        # Pairs (i, j), i in src, j in dst, closer than radius on the torus.
+        cx, cy = self._cells(dst)
+        key = cy * self.nx + cx
+        order = np.argsort(key, kind='stable')
+        bounds = np.searchsorted(key[order], np.arange(self.nx * self.ny + 1))
+        scx, scy = self._cells(src)
+        pi, pj = [], []
+        for dx, dy in self._offsets:
+            c = ((scy + dy) % self.ny) * self.nx + (scx + dx) % self.nx
+            owner, pos = _expand(src, bounds[c], bounds[c + 1])
+            pi.append(owner)
+            pj.append(dst[order[pos]])
+        i = np.concatenate(pi)
+        j = np.concatenate(pj)
+        ddx = np.abs(self.x[i] - self.x[j])
+        ddy = np.abs(self.y[i] - self.y[j])
+        ddx = np.minimum(ddx, self.width - ddx)
+        ddy = np.minimum(ddy, self.height - ddy)
+        near = ddx * ddx + ddy * ddy < self.radius * self.radius
+        return i[near], j[near]
+
+    def _graph_contacts(self, src):
+        indptr, indices = self.graph
+        owner, pos = _expand(src, indptr[src], indptr[src + 1])
+        return owner, indices[pos]
+
+    def infected_contacts(self):
+        # Number of infected contacts of every susceptible agent.
+        inf = np.nonzero(self.state == 2)[0]
+        sus = np.nonzero(self.state == 1)[0]
+        if len(inf) == 0 or len(sus) == 0:
+            return np.zeros(self.n, dtype=np.int64)
+        if self.graph is None:
+            _, j = self._spatial_contacts(inf, sus)
+        else:
+            _, j = self._graph_contacts(inf)
+            j = j[self.state[j] == 1]
+        return np.bincount(j, minlength=self.n)
+
+    def step(self):
+        self.move()
+        count = self.infected_contacts()
+        # Transitions are decided on the old states and applied together.
+        s = np.nonzero(count)[0]
+        inf = np.nonzero(self.state == 2)[0]
+
+        p = 1 - (1 - self.p_infect) ** count[s]
+        hit = s[self.rng.random(len(s)) < p]
+
+        die = self.rng.random(len(inf)) < self.p_die
+        recover = np.zeros_like(die)
+        recover[~die] = self.rng.random(int((~die).sum())) < self.p_recover
+
+        self.state[hit] = 2
+        self.infected_at[hit] = self.t + 1
+        self.state[inf[die]] = 4
+        self.state[inf[recover]] = 3
+        self.t += 1
+
+        n_hit, n_die, n_rec = len(hit), int(die.sum()), int(recover.sum())
+        self.totals[1] -= n_hit
+        self.totals[2] += n_hit - n_die - n_rec
+        self.totals[3] += n_rec
+        self.totals[4] += n_die
+        self._history.append(self.totals)
+        if self.totals[2] == 0 and self.extinct_at is None:
+            self.extinct_at = self.t
+
+    def recount(self):
+        self.totals = np.bincount(self.state, minlength=5)[:5].astype(np.int64)
+        self._history.clear()
+        self._history.append(self.totals)
+        self.extinct_at = self.t if self.totals[2] == 0 else None
+
+    def steady_state(self):
+        if self.extinct_at is None:
+            return None
+        return {'kind': 'extinct', 'period': 1, 'since': self.extinct_at}
+
+    def memory_usage(self):
+        usage = {'agents': self.x.nbytes + self.y.nbytes + self.state.nbytes + self.infected_at.nbytes,
+                 'graph': 0 if self.graph is None else self.graph[0].nbytes + self.graph[1].nbytes,
+                 'history': self._history.nbytes}
+        usage['total'] = sum(usage.values())
+        return usage
+
+    @property
+    def history(self):
+        return self._history.view()
+
+    def counts(self):
+        return {k: int(self.totals[k]) for k in range(5)}
\ No newline at end of file
@@ -0,0 +1,40 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from covid_simulation import CovidSimulation
+
+STATES = ('empty', 'susceptible', 'infected', 'recovered', 'dead')
+
+def trajectory(sim, steps):
+    # Per-step counts of each state, shape (steps + 1, 5); grids are not kept.
+    for _ in range(steps):
+        sim.step()
+    return sim.history[-(steps + 1):].copy()
+
+def _run_shard(seeds, steps, params):
+    return np.stack([trajectory(CovidSimulation(seed=s, **params), steps) for s in seeds])
+
+def run_ensemble(n_runs, steps, seed=None, workers=None, quantiles=(0.05, 0.5, 0.95), **params):
+    # Runs n_runs independent replicas of CovidSimulation(**params).  Every
+    # replica gets its own SeedSequence child, so results only depend on
+    # seed, never on how replicas are split across workers.
+    if n_runs < 1:
+        raise ValueError(f'n_runs must be >= 1, got {n_runs}')
+    children = np.random.SeedSequence(seed).spawn(n_runs)
+    workers = min(workers or os.cpu_count() or 1, n_runs)
+    if workers <= 1:
+        counts = _run_shard(children, steps, params)
+    else:
+        shards = [children[i::workers] for i in range(workers)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_run_shard, shards, [steps] * workers, [params] * workers))
+        counts = np.empty((n_runs, steps + 1, 5), dtype=np.int64)
+        for i, part in enumerate(parts):
+            counts[i::workers] = part
+    return {
+        'counts': counts,
+        'mean': counts.mean(axis=0),
+        'quantiles': {q: np.quantile(counts, q, axis=0) for q in quantiles},
+    }
\ No newline at end of file
@@ -1,44 +1,113 @@
-import random
 import numpy as np
 
+from ring_buffer import GrowingHistory
+
+# Cells per row block in step(); bounds the size of its temporaries.
+STEP_BLOCK = 1 << 16
+
 class CovidSimulation:
     # States: 0=empty, 1=susceptible, 2=infected, 3=recovered, 4=dead
-    def __init__(self, rows=60, cols=60, init_infected=5, p_infect=0.3, p_recover=0.02, p_die=0.005):
+    def __init__(self, rows=60, cols=60, init_infected=5, p_infect=0.3, p_recover=0.02, p_die=0.005, seed=None):
         self.rows = rows
         self.cols = cols
-        self.grid = np.ones((rows, cols), dtype=int)
+        self.grid = np.ones((rows, cols), dtype=np.uint8)
         self.t = 0
         self.p_infect = p_infect
         self.p_recover = p_recover
         self.p_die = p_die
-        for _ in range(init_infected):
-            r = random.randrange(rows)
-            c = random.randrange(cols)
-            self.grid[r, c] = 2
+        self.rng = np.random.default_rng(seed)
+        self._pad = np.zeros((rows + 2, cols + 2), dtype=np.uint8)
+        self._count = np.zeros((rows, cols), dtype=np.uint8)
+        self._table = (None, None)
+        r = self.rng.integers(rows, size=init_infected)
+        c = self.rng.integers(cols, size=init_infected)
+        self.grid[r, c] = 2
+        self._history = GrowingHistory(5)
+        self.recount()
+
+    def infection_table(self):
+        # P(infection) for a susceptible cell with k infected neighbors, k=0..8.
+        if self._table[0] != self.p_infect:
+            k = np.arange(9)
+            self._table = (self.p_infect, 1 - (1 - self.p_infect) ** k)
+        return self._table[1]
+
+    def infected_neighbors(self):
+        pad, count = self._pad, self._count
+        np.equal(self.grid, 2, out=pad[1:-1, 1:-1], casting='unsafe')
+        count[...] = 0
+        for dr in range(3):
+            for dc in range(3):
+                if dr == 1 and dc == 1:
+                    continue
+                count += pad[dr:dr + self.rows, dc:dc + self.cols]
+        return count
 
     def step(self):
-        new = self.grid.copy()
-        for r in range(self.rows):
-            for c in range(self.cols):
-                state = self.grid[r, c]
-                if state == 1:
-                    neigh = self.grid[max(0, r-1):r+2, max(0, c-1):c+2]
-                    infected_neighbors = np.sum(neigh == 2)
-                    if infected_neighbors > 0:
-                        p = 1 - ((1 - self.p_infect) ** infected_neighbors)
-                        if random.random() < p:
-                            new[r, c] = 2
-                elif state == 2:
-                    if random.random() < self.p_die:
-                        new[r, c] = 4
-                    elif random.random() < self.p_recover:
-                        new[r, c] = 3
-        self.grid = new
+        # Transitions are decided on the old grid: the infected neighbor
+        # counts are taken for the whole board first, after which each row
+        # block only reads and writes its own cells.  Index arrays and
+        # float32 draws are therefore sized by the block, not the board.
+        if self.grid.dtype != np.uint8 or not self.grid.flags.c_contiguous:
+            # A grid assigned from outside; adopt a compact copy once so the
+            # flat block views below write through to it.
+            self.grid = np.ascontiguousarray(self.grid, dtype=np.uint8)
+        count = self.infected_neighbors()
+        table = self.infection_table().astype(np.float32)
+        rows = max(1, STEP_BLOCK // self.cols)
+        n_hit = n_die = n_rec = 0
+        for r in range(0, self.rows, rows):
+            g = self.grid[r:r + rows].reshape(-1)
+            c = count[r:r + rows].reshape(-1)
+            s = np.flatnonzero((g == 1) & (c != 0))
+            i = np.flatnonzero(g == 2)
+            hit = s[self.rng.random(len(s), dtype=np.float32) < table[c[s]]]
+            die = self.rng.random(len(i), dtype=np.float32) < self.p_die
+            # Recovery is only tried for those that did not die.
+            alive = i[~die]
+            recover = alive[self.rng.random(len(alive), dtype=np.float32) < self.p_recover]
+            g[hit] = 2
+            g[i[die]] = 4
+            g[recover] = 3
+            n_hit += len(hit)
+            n_die += int(die.sum())
+            n_rec += len(recover)
         self.t += 1
 
+        self.totals[1] -= n_hit
+        self.totals[2] += n_hit - n_die - n_rec
+        self.totals[3] += n_rec
+        self.totals[4] += n_die
+        self._history.append(self.totals)
+        if self.totals[2] == 0 and self.extinct_at is None:
+            self.extinct_at = self.t
+
+    def recount(self):
+        # Full recount; needed only after the grid is modified from outside.
+        # Restarts the history at the current state.
+        self.totals = np.bincount(self.grid.ravel(), minlength=5)[:5].astype(np.int64)
+        self._history.clear()
+        self._history.append(self.totals)
+        self.extinct_at = self.t if self.totals[2] == 0 else None
+
+    def steady_state(self):
+        # The epidemic is stochastic, so the only steady state is extinction:
+        # with no infected cells nothing can change any more.  Same format as
+        # CycleDetector.status, with since as the simulation time t.
+        if self.extinct_at is None:
+            return None
+        return {'kind': 'extinct', 'period': 1, 'since': self.extinct_at}
+
+    def memory_usage(self):
+        usage = {'grid': self.grid.nbytes, 'scratch': self._pad.nbytes + self._count.nbytes,
+                 'history': self._history.nbytes}
+        usage['total'] = sum(usage.values())
+        return usage
+
+    @property
+    def history(self):
+        # Counts per recorded step, shape (T, 5), columns indexed by state.
+        return self._history.view()
+
     def counts(self):
-        unique, counts = np.unique(self.grid, return_counts=True)
-        d = {k:0 for k in range(5)}
-        for u, c in zip(unique, counts):
-            d[int(u)] = int(c)
-        return d
\ No newline at end of file
+        return {k: int(self.totals[k]) for k in range(5)}
\ No newline at end of file
@@ -0,0 +1,105 @@
+import hashlib
+import inspect
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import covid_simulation
+from covid_ensemble import trajectory
+from covid_simulation import CovidSimulation
+
+# Cached runs are keyed by parameters, seed and a hash of the model source,
+# so editing covid_simulation.py invalidates the cache automatically.
+CODE_VERSION = hashlib.sha1(inspect.getsource(covid_simulation).encode()).hexdigest()[:12]
+COLUMNS = ('empty', 'susceptible', 'infected', 'recovered', 'dead')
+
+def run_key(params, seed, steps):
+    payload = {k: (round(v, 12) if isinstance(v, float) else v) for k, v in sorted(params.items())}
+    payload.update(seed=seed, steps=steps, code=CODE_VERSION)
+    return hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+class RunStore:
+    # One compressed .npz per run with one int32 array per state column,
+    # plus a JSON sidecar with the parameters that produced it.
+    def __init__(self, path='covid_sweep_cache'):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, key):
+        return os.path.join(self.path, key + '.npz')
+
+    def __contains__(self, key):
+        return os.path.exists(self._file(key))
+
+    def load(self, key):
+        with np.load(self._file(key)) as data:
+            return np.stack([data[c] for c in COLUMNS], axis=1).astype(np.int64)
+
+    def save(self, key, counts, meta):
+        tmp = self._file(key) + '.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez_compressed(f, **{c: counts[:, i].astype(np.int32) for i, c in enumerate(COLUMNS)})
+        os.replace(tmp, self._file(key))
+        with open(os.path.join(self.path, key + '.json'), 'w') as f:
+            json.dump(meta, f, sort_keys=True)
+
+def _simulate(params, seed, steps):
+    return trajectory(CovidSimulation(seed=seed, **params), steps)
+
+def sweep(p_infect, p_recover, p_die, steps=100, seeds=(0,), rows=60, cols=60, init_infected=5,
+          store=None, workers=None):
+    # Runs every combination of the parameter lists for every seed and
+    # returns {(p_infect, p_recover, p_die, seed): counts of shape (steps + 1, 5)}.
+    # Runs already in the store are loaded instead of recomputed.
+    store = store if isinstance(store, RunStore) else RunStore(store or 'covid_sweep_cache')
+    jobs = {}
+    for pi, pr, pd, seed in itertools.product(p_infect, p_recover, p_die, seeds):
+        params = dict(rows=rows, cols=cols, init_infected=init_infected,
+                      p_infect=float(pi), p_recover=float(pr), p_die=float(pd))
+        jobs[(pi, pr, pd, seed)] = (params, seed, run_key(params, seed, steps))
+
+    missing = [job for job in jobs.values() if job[2] not in store]
+    if missing:
+        workers = min(workers or os.cpu_count() or 1, len(missing))
+        args = ([p for p, _, _ in missing], [s for _, s, _ in missing], [steps] * len(missing))
+        if workers <= 1:
+            results = list(map(_simulate, *args))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_simulate, *args))
+        for (params, seed, key), counts in zip(missing, results):
+            store.save(key, counts, dict(params, seed=seed, steps=steps, code=CODE_VERSION))
+
+    return {k: store.load(key) for k, (_, _, key) in jobs.items()}
+
+def _grid(lo, hi, points):
+    return list(np.linspace(lo, hi, points)) if hi > lo else [lo]
+
+def calibrate(target_infected, p_infect=(0.05, 0.6), p_recover=(0.0, 0.2), p_die=(0.0, 0.05),
+              points=4, rounds=3, seeds=(0, 1, 2), **sweep_kwargs):
+    # Grid search that narrows the ranges around the best point each round.
+    # The score is the squared error between the mean infected curve over
+    # seeds and target_infected.  Every evaluated run ends up in the store,
+    # so repeated calibrations only pay for new parameter points.
+    target = np.asarray(target_infected, dtype=float)
+    steps = len(target) - 1
+    ranges = [tuple(p_infect), tuple(p_recover), tuple(p_die)]
+    best = None
+    for _ in range(rounds):
+        axes = [_grid(lo, hi, points) for lo, hi in ranges]
+        runs = sweep(*axes, steps=steps, seeds=seeds, **sweep_kwargs)
+        for combo in itertools.product(*axes):
+            curve = np.mean([runs[combo + (s,)][:, 2] for s in seeds], axis=0)
+            err = float(np.sum((curve - target) ** 2))
+            if best is None or err < best[0]:
+                best = (err, combo)
+        ranges = []
+        for axis, value in zip(axes, best[1]):
+            lo, hi = axis[0], axis[-1]
+            half = (hi - lo) / max(points - 1, 1)
+            ranges.append((max(lo, value - half), min(hi, value + half)))
+    err, (pi, pr, pd) = best
+    return {'p_infect': float(pi), 'p_recover': float(pr), 'p_die': float(pd), 'error': err}
\ No newline at end of file
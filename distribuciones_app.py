@@ -6,7 +6,14 @@ matplotlib.use('TkAgg')
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
-from random_generators import RandomGenerators
+from instrumentation import Metrics
+from metrics_dialogs import export_metrics, profile
+from random_generators import SAMPLERS, RandomGenerators
+from sample_stream import iter_chunks, StreamingStats
+
+PROFILE_CALLS = 10
+# Smallest sample the streamed histogram's bin edges are fitted to.
+PILOT_SAMPLES = 100000
 
 def plot_histogram(data, ax, bins=50, title='', xlabel='x'):
     ax.clear()
@@ -15,6 +22,14 @@ def plot_histogram(data, ax, bins=50, title='', xlabel='x'):
     ax.set_xlabel(xlabel)
     ax.set_ylabel('Densidad')
 
+def integer_bins(data, max_bins=100):
+    # One bin per integer for narrow ranges; otherwise a fixed number of
+    # bins, so huge n or lambda never produce millions of bins.
+    lo, hi = int(np.min(data)), int(np.max(data))
+    if hi - lo + 1 <= max_bins:
+        return np.arange(lo, hi + 2) - 0.5
+    return max_bins
+
 class DistribucionesApp:
     def __init__(self, root):
         self.root = root
@@ -28,8 +43,7 @@ class DistribucionesApp:
 
         ttk.Label(left, text='Distribución:').pack(anchor='w')
         self.dist_var = tk.StringVar(value='normal')
-        dists = ['uniform','exponential','erlang','gamma','normal','weibull','bernoulli','binomial','poisson']
-        self.dist_combo = ttk.Combobox(left, values=dists, textvariable=self.dist_var, state='readonly')
+        self.dist_combo = ttk.Combobox(left, values=list(SAMPLERS), textvariable=self.dist_var, state='readonly')
         self.dist_combo.pack(fill='x')
 
         ttk.Label(left, text='Tamaño (n):').pack(anchor='w')
@@ -41,13 +55,33 @@ class DistribucionesApp:
         self.params_entry.insert(0, 'mu=0,sigma=1')
         self.params_entry.pack(fill='x')
 
+        self.stream_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(left, text='Generar por bloques', variable=self.stream_var).pack(anchor='w', pady=(10,0))
+        ttk.Label(left, text='Tamaño de bloque:').pack(anchor='w')
+        self.chunk_size = tk.IntVar(value=1000000)
+        ttk.Entry(left, textvariable=self.chunk_size).pack(fill='x')
+
         ttk.Button(left, text='Generar y graficar', command=self._generate_and_plot).pack(fill='x', pady=5)
 
+        # Sampling, histogram and drawing latency (p50 / p99).
+        self.metrics = Metrics()
+        box = ttk.LabelFrame(left, text='Métricas (p50 / p99)')
+        box.pack(fill='x', pady=(10, 0))
+        self.metrics_text = tk.StringVar(value='')
+        ttk.Label(box, textvariable=self.metrics_text, font='TkFixedFont', justify='left').pack(anchor='w')
+        ttk.Button(box, text='Exportar métricas', command=lambda: export_metrics(self.metrics)).pack(fill='x')
+        ttk.Button(box, text=f'Perfilar {PROFILE_CALLS} muestreos', command=self._profile).pack(fill='x')
+
         fig = Figure(figsize=(7,5))
         self.ax = fig.add_subplot(111)
         self.canvas = FigureCanvasTkAgg(fig, master=right)
         self.canvas.get_tk_widget().pack(fill='both', expand=True)
 
+        self.stream_job = None
+
+    def _profile(self):
+        profile(self.root, self.metrics, PROFILE_CALLS, f'Perfil de {PROFILE_CALLS} muestreos', phase='sample')
+
     def _parse_params(self, text):
         d = {}
         if not text:
@@ -65,59 +99,114 @@ class DistribucionesApp:
                         d[k.strip()] = v
         return d
 
+    def _sampler_args(self, dist, params):
+        # Keyword arguments for the sampler, plot title and histogram bins
+        # (None means one bin per integer value).
+        if dist == 'uniform':
+            a = params.get('a', 0.0)
+            b = params.get('b', 1.0)
+            return dict(a=a, b=b), f'Uniforme U({a},{b})', 50
+        elif dist == 'exponential':
+            lam = params.get('lam', params.get('lambda',1.0))
+            return dict(lam=lam), f'Exponencial (λ={lam})', 50
+        elif dist == 'erlang':
+            k = int(params.get('k',2))
+            lam = params.get('lam',1.0)
+            return dict(k=k, lam=lam), f'Erlang k={k}, λ={lam}', 50
+        elif dist == 'gamma':
+            shape = params.get('shape',2.0)
+            scale = params.get('scale',1.0)
+            return dict(shape=shape, scale=scale), f'Gamma(shape={shape}, scale={scale})', 50
+        elif dist == 'normal':
+            mu = params.get('mu',0.0)
+            sigma = params.get('sigma',1.0)
+            return dict(mu=mu, sigma=sigma), f'Normal N({mu},{sigma**2})', 50
+        elif dist == 'weibull':
+            k = params.get('k',1.5)
+            lam = params.get('lam',1.0)
+            return dict(k=k, lam=lam), f'Weibull k={k}, λ={lam}', 50
+        elif dist == 'bernoulli':
+            p = params.get('p',0.5)
+            return dict(p=p), f'Bernoulli p={p}', 2
+        elif dist == 'binomial':
+            nn = int(params.get('n',10))
+            p = params.get('p',0.5)
+            return dict(n=nn, p=p), f'Binomial n={nn}, p={p}', None
+        elif dist == 'poisson':
+            lam = params.get('lam',1.0)
+            return dict(lam=lam), f'Poisson λ={lam}', None
+        raise ValueError('Distribución no soportada')
+
     def _generate_and_plot(self):
         dist = self.dist_var.get()
         n = max(1, int(self.dist_size.get()))
         params = self._parse_params(self.params_entry.get())
+        # A stream still running would keep drawing over the new plot.
+        self._cancel_stream()
+        try:
+            kwargs, title, bins = self._sampler_args(dist, params)
+            if self.stream_var.get():
+                self._start_stream(dist, n, kwargs, title, bins)
+                return
+            with self.metrics.timer('sample'):
+                data = getattr(RandomGenerators, dist)(size=n, **kwargs)
+            with self.metrics.timer('hist'):
+                plot_histogram(data, self.ax, bins=integer_bins(data) if bins is None else bins, title=title)
+            with self.metrics.timer('draw'):
+                self.canvas.draw()
+            self.metrics_text.set(self.metrics.text())
+        except Exception as e:
+            messagebox.showerror('Error', f'Error generando la distribución: {e}')
+
+    # ---------------- Generación por bloques ----------------
+    def _cancel_stream(self):
+        if self.stream_job is not None:
+            self.root.after_cancel(self.stream_job)
+            self.stream_job = None
+
+    def _start_stream(self, dist, n, kwargs, title, bins):
+        # Samples are drawn and folded into the histogram one chunk per Tk
+        # callback, so memory depends on the chunk size and not on n.
+        chunk_size = max(1, int(self.chunk_size.get()))
+        self.stream_chunks = iter_chunks(dist, n, kwargs, chunk_size=chunk_size)
+        self.stream_stats = StreamingStats(bins=bins or 100)
+        if chunk_size < min(n, PILOT_SAMPLES):
+            # The first chunk alone would fit the edges to too narrow a range.
+            pilot = getattr(RandomGenerators, dist)(size=min(n, PILOT_SAMPLES), **kwargs)
+            self.stream_stats.fit_edges(pilot)
+        self.stream_title = title
+        self.ax.clear()
+        self.ax.set_xlabel('x')
+        self.ax.set_ylabel('Densidad')
+        self.stream_artist = None
+        self.stream_job = None
+        self._stream_next()
+
+    def _stream_next(self):
         try:
-            if dist == 'uniform':
-                a = params.get('a', 0.0)
-                b = params.get('b', 1.0)
-                data = RandomGenerators.uniform(a=a,b=b,size=n)
-                plot_histogram(data, self.ax, bins=50, title=f'Uniforme U({a},{b})')
-            elif dist == 'exponential':
-                lam = params.get('lam', params.get('lambda',1.0))
-                data = RandomGenerators.exponential(lam=lam,size=n)
-                plot_histogram(data, self.ax, bins=50, title=f'Exponencial (λ={lam})')
-            elif dist == 'erlang':
-                k = int(params.get('k',2))
-                lam = params.get('lam',1.0)
-                data = RandomGenerators.erlang(k=k,lam=lam,size=n)
-                plot_histogram(data, self.ax, bins=50, title=f'Erlang k={k}, λ={lam}')
-            elif dist == 'gamma':
-                shape = params.get('shape',2.0)
-                scale = params.get('scale',1.0)
-                data = RandomGenerators.gamma(shape=shape, scale=scale, size=n)
-                plot_histogram(data, self.ax, bins=50, title=f'Gamma(shape={shape}, scale={scale})')
-            elif dist == 'normal':
-                mu = params.get('mu',0.0)
-                sigma = params.get('sigma',1.0)
-                data = RandomGenerators.normal(mu=mu,sigma=sigma,size=n)
-                plot_histogram(data, self.ax, bins=50, title=f'Normal N({mu},{sigma**2})')
-            elif dist == 'weibull':
-                k = params.get('k',1.5)
-                lam = params.get('lam',1.0)
-                data = RandomGenerators.weibull(k=k,lam=lam,size=n)
-                plot_histogram(data, self.ax, bins=50, title=f'Weibull k={k}, λ={lam}')
-            elif dist == 'bernoulli':
-                p = params.get('p',0.5)
-                data = RandomGenerators.bernoulli(p=p,size=n)
-                plot_histogram(data, self.ax, bins=2, title=f'Bernoulli p={p}')
-            elif dist == 'binomial':
-                nn = int(params.get('n',10))
-                p = params.get('p',0.5)
-                data = RandomGenerators.binomial(n=nn,p=p,size=n)
-                plot_histogram(data, self.ax, bins=range(0,nn+2), title=f'Binomial n={nn}, p={p}')
-            elif dist == 'poisson':
-                lam = params.get('lam',1.0)
-                data = RandomGenerators.poisson(lam=lam,size=n)
-                plot_histogram(data, self.ax, bins=range(0,int(max(data))+2), title=f'Poisson λ={lam}')
-            else:
-                raise ValueError('Distribución no soportada')
-
-            self.canvas.draw()
+            with self.metrics.timer('sample'):
+                chunk = next(self.stream_chunks, None)
         except Exception as e:
+            self.stream_job = None
             messagebox.showerror('Error', f'Error generando la distribución: {e}')
+            return
+        if chunk is None:
+            self.stream_job = None
+            return
+        st = self.stream_stats
+        with self.metrics.timer('hist'):
+            st.update(chunk)
+        if self.stream_artist is None:
+            self.stream_artist = self.ax.stairs(st.density(), st.edges, fill=True, alpha=0.7)
+        else:
+            self.stream_artist.set_data(st.density())
+        self.ax.relim()
+        self.ax.autoscale_view()
+        outside = f'  fuera del histograma={st.outside}' if st.outside else ''
+        self.ax.set_title(f'{self.stream_title}\nn={st.count}  media={st.mean:.4g}  var={st.variance:.4g}{outside}')
+        self.canvas.draw_idle()
+        self.metrics_text.set(self.metrics.text())
+        self.stream_job = self.root.after(1, self._stream_next)
 
 def main():
     root = tk.Tk()
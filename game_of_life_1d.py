@@ -1,30 +1,196 @@
 import numpy as np
 
+from ring_buffer import RingHistory
+from steady_state import CycleDetector, state_hash
+
+def check_rule(rule):
+    # Wolfram code: bit 4*left + 2*center + right is the next center cell.
+    if not 0 <= rule <= 255:
+        raise ValueError(f'rule must be in 0..255, got {rule}')
+    return rule
+
 class GameOfLife1D:
-    def __init__(self, length=200, rule=30):
+    def __init__(self, length=200, rule=30, history_depth=None, cycle_window=None):
         self.length = length
-        self.rule = rule
-        self.rule_map = self._rule_to_map(rule)
-        self.state = np.zeros(length, dtype=int)
+        self.rule = check_rule(rule)
+        self.history = RingHistory(history_depth, length) if history_depth else None
+        self.cycles = CycleDetector(cycle_window) if cycle_window else None
+        self.state = np.zeros(length, dtype=np.uint8)
         self.state[length // 2] = 1
+        # Double buffer: step() writes the next state here and swaps.
+        self._spare = np.zeros(length, dtype=np.uint8)
+        self._idx = np.zeros(length, dtype=np.uint8)
+        if self.history is not None:
+            self.history.push(self.state)
+        if self.cycles is not None:
+            self._observe(self.state)
+
+    def _observe(self, row):
+        # Cells are 0/1, so the bit-packed row identifies the state at an
+        # eighth of the hashing cost.
+        cells = np.packbits(row)
+        h = state_hash(cells)
+        self.cycles.update(h, extinct=h == 0 and not cells.any(), state=cells)
 
-    def _rule_to_map(self, rule):
-        bits = [(rule >> i) & 1 for i in range(8)]
-        triplets = [(1,1,1),(1,1,0),(1,0,1),(1,0,0),(0,1,1),(0,1,0),(0,0,1),(0,0,0)]
-        return {triplets[i]: bits[7-i] for i in range(8)}
+    def steady_state(self):
+        # See CycleDetector.status; None when not tracked.
+        return None if self.cycles is None else self.cycles.status()
+
+    def _next(self, cur, out):
+        # idx = 4*left + 2*center + right on a ring, built in place: out
+        # first holds the left neighbors, and the rule bit is then read
+        # with a shift, so nothing is allocated.
+        idx = self._idx
+        if len(idx) != len(cur):
+            idx = self._idx = np.zeros(len(cur), dtype=np.uint8)
+        np.left_shift(cur[:-1], 2, out=out[1:])
+        out[0] = cur[-1] << 2
+        np.left_shift(cur, 1, out=idx)
+        idx |= out
+        idx[:-1] |= cur[1:]
+        idx[-1] |= cur[0]
+        np.right_shift(np.uint8(self.rule), idx, out=out)
+        out &= 1
+        return out
+
+    def memory_usage(self):
+        usage = {'state': self.state.nbytes + self._spare.nbytes,
+                 'history': 0 if self.history is None else self.history.nbytes}
+        usage['total'] = sum(usage.values())
+        return usage
 
     def step(self):
-        new = np.zeros_like(self.state)
-        for i in range(self.length):
-            left = self.state[(i-1) % self.length]
-            center = self.state[i]
-            right = self.state[(i+1) % self.length]
-            new[i] = self.rule_map[(left, center, right)]
-        self.state = new
+        self.state, self._spare = self._next(self.state, self._spare), self.state
+        if self.history is not None:
+            self.history.push(self.state)
+        if self.cycles is not None:
+            self._observe(self.state)
+
+    def run(self, steps):
+        # Space-time diagram: row 0 is the current state, row t the state
+        # after t steps.  The automaton is left at the last row.
+        out = np.empty((steps + 1, self.length), dtype=np.uint8)
+        out[0] = self.state
+        for t in range(steps):
+            self._next(out[t], out[t + 1])
+        self.state[...] = out[-1]
+        if self.history is not None:
+            for row in out[max(1, steps + 1 - self.history.depth):]:
+                self.history.push(row)
+        if self.cycles is not None:
+            for row in out[1:]:
+                self._observe(row)
+        return out
 
     def reset(self, seed=None):
-        self.state = np.zeros(self.length, dtype=int)
         if seed is None:
+            self.state = np.zeros(self.length, dtype=np.uint8)
             self.state[self.length // 2] = 1
         else:
-            self.state = np.array(seed, dtype=int)
\ No newline at end of file
+            self.state = np.array(seed, dtype=np.uint8)
+        if len(self._spare) != len(self.state):
+            self._spare = np.zeros(len(self.state), dtype=np.uint8)
+        if self.history is not None:
+            self.history.clear()
+            self.history.push(self.state)
+        if self.cycles is not None:
+            self.cycles.clear()
+            self._observe(self.state)
+
+class PackedGameOfLife1D:
+    # Same automaton with 64 cells per uint64 word (cell i is bit i % 64 of
+    # word i // 64).  The rule is applied as a sum of minterms over whole
+    # words, which is what makes million-cell lines cheap.
+    def __init__(self, length=200, rule=30, cycle_window=None):
+        self.length = length
+        self.rule = check_rule(rule)
+        self.cycles = CycleDetector(cycle_window) if cycle_window else None
+        self.nwords = -(-length // 64)
+        self._spare = np.zeros(self.nwords, dtype=np.uint64)
+        self._last_bit = np.uint64((length - 1) % 64)
+        tail = length % 64
+        self._tail_mask = np.uint64((1 << tail) - 1 if tail else (1 << 64) - 1)
+        self.reset()
+
+    @staticmethod
+    def pack(cells, nwords):
+        bits = np.zeros(nwords * 64, dtype=np.uint8)
+        bits[:len(cells)] = np.asarray(cells) != 0
+        return np.packbits(bits, bitorder='little').view('<u8').astype(np.uint64)
+
+    def unpack(self, words):
+        bits = np.unpackbits(np.ascontiguousarray(words, dtype='<u8').view(np.uint8), bitorder='little')
+        return bits[:self.length]
+
+    @property
+    def state(self):
+        return self.unpack(self.words)
+
+    def reset(self, seed=None):
+        if seed is None:
+            cells = np.zeros(self.length, dtype=np.uint8)
+            cells[self.length // 2] = 1
+        else:
+            cells = np.asarray(seed)
+            if len(cells) != self.length:
+                raise ValueError('seed length must equal length')
+        self.words = self.pack(cells, self.nwords)
+        if self.cycles is not None:
+            self.cycles.clear()
+            self._observe(self.words)
+
+    def _observe(self, words):
+        # Unused tail bits are always zero, so the packed words hash as is.
+        h = state_hash(words)
+        self.cycles.update(h, extinct=h == 0 and not words.any(), state=words)
+
+    def steady_state(self):
+        return None if self.cycles is None else self.cycles.status()
+
+    def memory_usage(self):
+        usage = {'state': self.words.nbytes + self._spare.nbytes}
+        usage['total'] = usage['state']
+        return usage
+
+    def _next(self, w, out):
+        one = np.uint64(1)
+        top = np.uint64(63)
+        left = (w << one) | (np.roll(w, 1) >> top)
+        right = (w >> one) | (np.roll(w, -1) << top)
+        # Periodic boundary across the unused bits of the last word.
+        first = w[0] & one
+        last = (w[-1] >> self._last_bit) & one
+        left[0] = (left[0] & ~one) | last
+        right[-1] = (right[-1] & ~(one << self._last_bit)) | (first << self._last_bit)
+        out[...] = 0
+        for i in range(8):
+            if (self.rule >> i) & 1:
+                l = left if i & 4 else ~left
+                c = w if i & 2 else ~w
+                r = right if i & 1 else ~right
+                out |= l & c & r
+        out[-1] &= self._tail_mask
+        return out
+
+    def step(self):
+        self.words, self._spare = self._next(self.words, self._spare), self.words
+        if self.cycles is not None:
+            self._observe(self.words)
+
+    def run(self, steps, unpack=True):
+        # Packed diagram of shape (steps + 1, nwords), or the unpacked
+        # (steps + 1, length) uint8 diagram when unpack is True.
+        words = np.empty((steps + 1, self.nwords), dtype=np.uint64)
+        words[0] = self.words
+        for t in range(steps):
+            self._next(words[t], words[t + 1])
+        self.words = words[-1].copy()
+        if self.cycles is not None:
+            for row in words[1:]:
+                self._observe(row)
+        if not unpack:
+            return words
+        out = np.empty((steps + 1, self.length), dtype=np.uint8)
+        for t in range(steps + 1):
+            out[t] = self.unpack(words[t])
+        return out
\ No newline at end of file
@@ -1,23 +1,227 @@
 import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+from steady_state import CycleDetector, state_hash
+
+BOUNDARIES = ('clip', 'wrap')
+
+def parse_rule(rule):
+    # Outer-totalistic Moore rule in B/S notation ('B3/S23', 'B36/S23',
+    # 'B2/S', 'S23/B3').  Returns the 18-entry transition table indexed by
+    # 9 * state + live_neighbors.
+    born, survive = None, None
+    for part in rule.upper().replace(' ', '').split('/'):
+        if part[:1] == 'B' and born is None:
+            born = part[1:]
+        elif part[:1] == 'S' and survive is None:
+            survive = part[1:]
+        else:
+            raise ValueError(f'invalid rule {rule!r}, expected e.g. B3/S23')
+    if born is None or survive is None or any(c not in '012345678' for c in born + survive):
+        raise ValueError(f'invalid rule {rule!r}, expected e.g. B3/S23')
+    table = np.zeros(18, dtype=np.uint8)
+    table[[int(c) for c in born]] = 1
+    table[[9 + int(c) for c in survive]] = 1
+    return table
 
 class GameOfLife2D:
-    def __init__(self, rows=50, cols=50):
+    def __init__(self, rows=50, cols=50, boundary='clip', tile_size=None, rule='B3/S23', cycle_window=None):
+        if boundary not in BOUNDARIES:
+            raise ValueError(f'boundary must be one of {BOUNDARIES}')
+        if tile_size is not None and tile_size < 1:
+            raise ValueError('tile_size must be >= 1')
         self.rows = rows
         self.cols = cols
-        self.grid = np.zeros((rows, cols), dtype=int)
-
-    def randomize(self, p=0.2):
-        self.grid = (np.random.random((self.rows, self.cols)) < p).astype(int)
-
-    def step(self):
-        new = np.zeros_like(self.grid)
-        for r in range(self.rows):
-            for c in range(self.cols):
-                total = np.sum(self.grid[max(0, r-1):r+2, max(0, c-1):c+2]) - self.grid[r, c]
-                if self.grid[r, c] == 1:
-                    if total == 2 or total == 3:
-                        new[r, c] = 1
-                else:
-                    if total == 3:
-                        new[r, c] = 1
-        self.grid = new
\ No newline at end of file
+        self.boundary = boundary
+        self.tile_size = tile_size
+        self.rule = rule
+        self.table = parse_rule(rule)
+        self.grid = np.zeros((rows, cols), dtype=np.uint8)
+        self.stats = {}
+        self._scratch = None
+        self._tiles = None
+        self.cycles = CycleDetector(cycle_window) if cycle_window else None
+
+    def randomize(self, p=0.2, seed=None):
+        rng = np.random if seed is None else np.random.default_rng(seed)
+        # Drawn in row blocks so huge boards never hold a float per cell;
+        # the values are the same as a single rng.random((rows, cols)).
+        grid = np.empty((self.rows, self.cols), dtype=np.uint8)
+        block = max(1, (1 << 22) // max(1, self.cols))
+        for r in range(0, self.rows, block):
+            np.less(rng.random((min(block, self.rows - r), self.cols)), p, out=grid[r:r + block])
+        self.grid = grid
+        if self.cycles is not None:
+            self.cycles.clear()
+
+    def _observe(self):
+        # Cells are 0/1, so the bit-packed board identifies the state at an
+        # eighth of the hashing cost.
+        cells = np.packbits(self.grid)
+        h = state_hash(cells)
+        self.cycles.update(h, extinct=h == 0 and not cells.any(), state=cells)
+
+    def steady_state(self):
+        # Fixed point, cycle or extinction reached since the last
+        # randomize() (see CycleDetector.status); None when not tracked.
+        # After editing grid by hand call cycles.clear().
+        return None if self.cycles is None else self.cycles.status()
+
+    def _get_scratch(self):
+        # Padded copy of the grid and neighbor counts, allocated once and
+        # reused by every step.  The padded copy is the second buffer of a
+        # double buffer: the old generation lives there while the new one
+        # is written over grid.
+        if self._scratch is None:
+            self._scratch = (
+                np.zeros((self.rows + 2, self.cols + 2), dtype=np.uint8),
+                np.zeros((self.rows, self.cols), dtype=np.uint8),
+            )
+        return self._scratch
+
+    def memory_usage(self):
+        # Bytes held by each buffer of the model, plus the total.
+        usage = {'grid': self.grid.nbytes}
+        if self._scratch is not None:
+            usage['scratch'] = sum(a.nbytes for a in self._scratch)
+        if self._tiles is not None:
+            # grid is a view into the tiled buffer, not a separate array.
+            usage['grid'] = 0
+            usage['tiles'] = self._tiles['pad'].nbytes + self._tiles['active'].nbytes
+        usage['total'] = sum(usage.values())
+        return usage
+
+    def neighbor_counts(self):
+        pad, count = self._get_scratch()
+        pad[1:-1, 1:-1] = self.grid
+        if self.boundary == 'wrap':
+            pad[0, 1:-1] = pad[-2, 1:-1]
+            pad[-1, 1:-1] = pad[1, 1:-1]
+            pad[:, 0] = pad[:, -2]
+            pad[:, -1] = pad[:, 1]
+        # With 'clip' the border of pad is never written and stays zero,
+        # which matches counting over a window clipped at the edges.
+        count[...] = 0
+        for dr in range(3):
+            for dc in range(3):
+                if dr == 1 and dc == 1:
+                    continue
+                count += pad[dr:dr + self.rows, dc:dc + self.cols]
+        return count
+
+    def step(self, n=1):
+        if self.cycles is not None and self.cycles.t == 0:
+            self._observe()
+        for _ in range(int(n)):
+            if self.tile_size is None:
+                self._step_dense()
+            else:
+                self._step_tiled()
+            if self.cycles is not None:
+                self._observe()
+
+    def _step_dense(self):
+        grid = self.grid
+        if grid.dtype != np.uint8 or not grid.flags.c_contiguous:
+            # A grid assigned from outside; adopt a compact copy once.
+            grid = self.grid = np.ascontiguousarray(grid, dtype=np.uint8)
+        count = self.neighbor_counts()
+        # One table lookup per cell, whatever the rule.  The old generation
+        # is kept in pad, so grid itself holds the indices and then the
+        # new generation.  np.take widens its indices to intp, so it runs
+        # over row blocks to keep that temporary small.
+        grid *= 9
+        grid += count
+        block = max(1, (1 << 16) // max(1, self.cols))
+        for r in range(0, self.rows, block):
+            np.take(self.table, grid[r:r + block], out=grid[r:r + block], mode='clip')
+        self.stats = {'active_tiles': 1, 'total_tiles': 1,
+                      'cells_evaluated': self.rows * self.cols}
+
+    # ---------------- tiled mode ----------------
+    # The board is split into tile_size x tile_size blocks.  Only blocks that
+    # changed in the previous generation, and their neighbors, can change in
+    # the next one, so everything else is skipped.  In this mode grid is a
+    # uint8 view into a padded buffer; assigning a new array to grid is
+    # picked up on the next step, in-place edits need invalidate().
+
+    def _get_tiles(self):
+        if self._tiles is None:
+            t = self.tile_size
+            nty = -(-self.rows // t)
+            ntx = -(-self.cols // t)
+            pad = np.zeros((nty * t + 2, ntx * t + 2), dtype=np.uint8)
+            s0, s1 = pad.strides
+            windows = as_strided(pad, shape=(nty, ntx, t + 2, t + 2), strides=(t * s0, t * s1, s0, s1))
+            blocks = as_strided(pad[1:, 1:], shape=(nty, ntx, t, t), strides=(t * s0, t * s1, s0, s1))
+            # Cells of edge tiles that fall outside the board always stay dead.
+            row_valid = (np.arange(nty * t) < self.rows).reshape(nty, t)
+            col_valid = (np.arange(ntx * t) < self.cols).reshape(ntx, t)
+            self._tiles = {'pad': pad, 'windows': windows, 'blocks': blocks,
+                           'row_valid': row_valid, 'col_valid': col_valid,
+                           'view': pad[1:self.rows + 1, 1:self.cols + 1],
+                           'active': np.ones((nty, ntx), dtype=bool)}
+        tiles = self._tiles
+        if self.grid is not tiles['view']:
+            tiles['view'][...] = self.grid
+            self.grid = tiles['view']
+            self._refresh_halo()
+            tiles['active'][...] = True
+        return tiles
+
+    def invalidate(self):
+        if self._tiles is not None:
+            self._tiles['active'][...] = True
+            self._refresh_halo()
+
+    def _refresh_halo(self):
+        if self.boundary != 'wrap':
+            return
+        pad = self._tiles['pad']
+        r, c = self.rows, self.cols
+        pad[0, 1:c + 1] = pad[r, 1:c + 1]
+        pad[r + 1, 1:c + 1] = pad[1, 1:c + 1]
+        pad[:r + 2, 0] = pad[:r + 2, c]
+        pad[:r + 2, c + 1] = pad[:r + 2, 1]
+
+    def _step_tiled(self):
+        tiles = self._get_tiles()
+        active = tiles['active']
+        ty, tx = np.nonzero(active)
+        t = self.tile_size
+        if len(ty):
+            win = tiles['windows'][ty, tx]
+            count = np.zeros((len(ty), t, t), dtype=np.uint8)
+            for dr in range(3):
+                for dc in range(3):
+                    if dr == 1 and dc == 1:
+                        continue
+                    count += win[:, dr:dr + t, dc:dc + t]
+            centre = win[:, 1:-1, 1:-1]
+            new = self.table[centre * np.uint8(9) + count]
+            valid = tiles['row_valid'][ty][:, :, None] & tiles['col_valid'][tx][:, None, :]
+            new &= valid
+            changed = ((new != centre) & valid).any(axis=(1, 2))
+            tiles['blocks'][ty[changed], tx[changed]] = new[changed]
+        else:
+            changed = np.zeros(0, dtype=bool)
+        self._refresh_halo()
+
+        # Next generation: changed tiles and their eight neighbors.
+        mark = np.zeros_like(active)
+        mark[ty[changed], tx[changed]] = True
+        if self.boundary == 'wrap':
+            nxt = mark.copy()
+            for dr in (-1, 0, 1):
+                for dc in (-1, 0, 1):
+                    nxt |= np.roll(np.roll(mark, dr, axis=0), dc, axis=1)
+        else:
+            mpad = np.zeros((mark.shape[0] + 2, mark.shape[1] + 2), dtype=bool)
+            mpad[1:-1, 1:-1] = mark
+            nxt = np.zeros_like(mark)
+            for dr in range(3):
+                for dc in range(3):
+                    nxt |= mpad[dr:dr + mark.shape[0], dc:dc + mark.shape[1]]
+        active[...] = nxt
+        self.stats = {'active_tiles': int(len(ty)), 'total_tiles': int(active.size),
+                      'changed_tiles': int(changed.sum()), 'cells_evaluated': int(len(ty)) * t * t}
\ No newline at end of file
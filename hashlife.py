@@ -0,0 +1,227 @@
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+
+from game_of_life_2d import parse_rule
+
+# Hash-consed quadtree for Life-like rules on an unbounded plane.
+# A node of level k covers a 2^k x 2^k square; a, b, c, d are its
+# NW, NE, SW, SE quadrants and n its population.
+
+class _Node:
+    __slots__ = ('k', 'a', 'b', 'c', 'd', 'n', '__weakref__')
+
+    def __init__(self, k, a, b, c, d, n):
+        self.k = k
+        self.a = a
+        self.b = b
+        self.c = c
+        self.d = d
+        self.n = n
+
+_OFF = _Node(0, None, None, None, None, 0)
+_ON = _Node(0, None, None, None, None, 1)
+
+# Measured with tracemalloc on CPython 3.11: an interned node with its
+# weak-dictionary entry, and one successor-cache entry without the nodes
+# it references.  Each cache entry keeps about one node alive, so a byte
+# budget is turned into NODE_BYTES + CACHE_ENTRY_BYTES per entry.
+NODE_BYTES = 290
+CACHE_ENTRY_BYTES = 150
+
+class HashLife2D:
+    # Memoized engine for structured patterns (oscillators, spaceships,
+    # guns) where large jumps hit the cache.  Chaotic soups keep producing
+    # new subtrees and run much faster on the dense GameOfLife2D.
+    #
+    # The successor cache is an LRU bounded by max_cache_bytes (an estimate
+    # from the costs above); max_cache, when given, bounds the number of
+    # entries directly instead.
+    def __init__(self, rows=50, cols=50, max_cache=None, rule='B3/S23', max_cache_bytes=512 << 20):
+        table = parse_rule(rule)
+        if table[0]:
+            # With B0 the empty plane is not stable, which HashLife relies on.
+            raise ValueError('HashLife2D does not support B0 rules')
+        self.rows = rows
+        self.cols = cols
+        self.rule = rule
+        self.table = table
+        if max_cache is None:
+            max_cache = max_cache_bytes // (NODE_BYTES + CACHE_ENTRY_BYTES)
+        self.max_cache = max(1, int(max_cache))
+        self.generation = 0
+        # Nodes live only while something references them; the bounded
+        # successor cache is what keeps recently used subtrees alive.
+        self._nodes = weakref.WeakValueDictionary()
+        self._cache = OrderedDict()
+        self._zeros = [_OFF]
+        self.grid = np.zeros((rows, cols), dtype=np.uint8)
+
+    # ---------------- node construction ----------------
+    def _join(self, a, b, c, d):
+        key = (a, b, c, d)
+        node = self._nodes.get(key)
+        if node is None:
+            node = _Node(a.k + 1, a, b, c, d, a.n + b.n + c.n + d.n)
+            self._nodes[key] = node
+        return node
+
+    def _zero(self, k):
+        while len(self._zeros) <= k:
+            z = self._zeros[-1]
+            self._zeros.append(self._join(z, z, z, z))
+        return self._zeros[k]
+
+    def _centre(self, m):
+        z = self._zero(m.k - 1)
+        return self._join(self._join(z, z, z, m.a), self._join(z, z, m.b, z),
+                          self._join(z, m.c, z, z), self._join(m.d, z, z, z))
+
+    def _from_array(self, arr, k):
+        if k == 0:
+            return _ON if arr[0, 0] else _OFF
+        if not arr.any():
+            return self._zero(k)
+        h = 1 << (k - 1)
+        return self._join(self._from_array(arr[:h, :h], k - 1), self._from_array(arr[:h, h:], k - 1),
+                          self._from_array(arr[h:, :h], k - 1), self._from_array(arr[h:, h:], k - 1))
+
+    def _fill(self, node, out, top, left):
+        # Write the cells of node (top-left corner at top, left in window
+        # coordinates) that fall inside out.
+        size = 1 << node.k
+        if node.n == 0 or top >= out.shape[0] or left >= out.shape[1] or top + size <= 0 or left + size <= 0:
+            return
+        if node.k == 0:
+            out[top, left] = 1
+            return
+        h = size >> 1
+        self._fill(node.a, out, top, left)
+        self._fill(node.b, out, top, left + h)
+        self._fill(node.c, out, top + h, left)
+        self._fill(node.d, out, top + h, left + h)
+
+    # ---------------- evolution ----------------
+    def _life_4x4(self, m):
+        cells = [[m.a.a, m.a.b, m.b.a, m.b.b],
+                 [m.a.c, m.a.d, m.b.c, m.b.d],
+                 [m.c.a, m.c.b, m.d.a, m.d.b],
+                 [m.c.c, m.c.d, m.d.c, m.d.d]]
+        bits = [[cell.n for cell in row] for row in cells]
+        out = []
+        for r in (1, 2):
+            for c in (1, 2):
+                total = sum(bits[rr][cc] for rr in (r - 1, r, r + 1) for cc in (c - 1, c, c + 1)) - bits[r][c]
+                out.append(_ON if self.table[9 * bits[r][c] + total] else _OFF)
+        return self._join(*out)
+
+    def _successor(self, m, j):
+        # Centre level k-1 node of m advanced 2^j generations.  Any j above
+        # k-2 means the full 2^(k-2) step, so it is clamped to keep a single
+        # cache key per result.
+        if m.n == 0:
+            return m.a
+        j = min(j, m.k - 2)
+        key = (m, j)
+        s = self._cache.get(key)
+        if s is not None:
+            self._cache.move_to_end(key)
+            return s
+        if m.k == 2:
+            s = self._life_4x4(m)
+        else:
+            join = self._join
+            succ = self._successor
+            a, b, c, d = m.a, m.b, m.c, m.d
+            c1 = succ(join(a.a, a.b, a.c, a.d), j)
+            c2 = succ(join(a.b, b.a, a.d, b.c), j)
+            c3 = succ(join(b.a, b.b, b.c, b.d), j)
+            c4 = succ(join(a.c, a.d, c.a, c.b), j)
+            c5 = succ(join(a.d, b.c, c.b, d.a), j)
+            c6 = succ(join(b.c, b.d, d.a, d.b), j)
+            c7 = succ(join(c.a, c.b, c.c, c.d), j)
+            c8 = succ(join(c.b, d.a, c.d, d.c), j)
+            c9 = succ(join(d.a, d.b, d.c, d.d), j)
+            if j < m.k - 2:
+                s = join(join(c1.d, c2.c, c4.b, c5.a), join(c2.d, c3.c, c5.b, c6.a),
+                         join(c4.d, c5.c, c7.b, c8.a), join(c5.d, c6.c, c8.b, c9.a))
+            else:
+                s = join(succ(join(c1, c2, c4, c5), j), succ(join(c2, c3, c5, c6), j),
+                         succ(join(c4, c5, c7, c8), j), succ(join(c5, c6, c8, c9), j))
+        self._cache[key] = s
+        if len(self._cache) > self.max_cache:
+            self._cache.popitem(last=False)
+        return s
+
+    def _crop(self, m):
+        # Drop empty outer rings so the tree does not keep growing.
+        while m.k > 3:
+            a, b, c, d = m.a, m.b, m.c, m.d
+            inner = a.d.n + b.c.n + c.b.n + d.a.n
+            if inner != m.n:
+                break
+            m = self._join(a.d, b.c, c.b, d.a)
+        return m
+
+    def _advance(self, n):
+        root = self._root
+        j = 0
+        while n:
+            if n & 1:
+                # The pattern can spread 2^j cells; the two extra levels of
+                # empty border keep the returned centre node exact.
+                while root.k < max(j + 1, 2):
+                    root = self._centre(root)
+                root = self._successor(self._centre(self._centre(root)), j)
+                root = self._crop(root)
+            n >>= 1
+            j += 1
+        self._root = root
+
+    # ---------------- GameOfLife2D interface ----------------
+    @property
+    def grid(self):
+        # The root is centred on the origin; the window is the rows x cols
+        # block whose top-left cell is the origin.
+        out = np.zeros((self.rows, self.cols), dtype=np.uint8)
+        half = 1 << (self._root.k - 1)
+        self._fill(self._root, out, -half, -half)
+        return out
+
+    @grid.setter
+    def grid(self, value):
+        value = np.asarray(value)
+        if value.shape != (self.rows, self.cols):
+            raise ValueError('grid shape must be (rows, cols)')
+        k = 1
+        while (1 << (k - 1)) < max(self.rows, self.cols, 2):
+            k += 1
+        half = 1 << (k - 1)
+        arr = np.zeros((1 << k, 1 << k), dtype=bool)
+        arr[half:half + self.rows, half:half + self.cols] = value != 0
+        self._root = self._crop(self._from_array(arr, k))
+
+    @property
+    def population(self):
+        return self._root.n
+
+    def memory_usage(self):
+        # Estimated bytes of the live quadtree nodes and of the successor
+        # cache; both grow with the pattern's structure, not with its area.
+        usage = {'nodes': len(self._nodes) * NODE_BYTES,
+                 'cache': len(self._cache) * CACHE_ENTRY_BYTES}
+        usage['total'] = sum(usage.values())
+        return usage
+
+    def randomize(self, p=0.2, seed=None):
+        rng = np.random if seed is None else np.random.default_rng(seed)
+        self.grid = rng.random((self.rows, self.cols)) < p
+        self.generation = 0
+
+    def step(self, n=1):
+        n = int(n)
+        if n < 0:
+            raise ValueError('n must be >= 0')
+        self._advance(n)
+        self.generation += n
\ No newline at end of file
@@ -0,0 +1,165 @@
+import contextlib
+import cProfile
+import csv
+import io
+import json
+import math
+import pstats
+import threading
+import time
+
+# Per-phase timing for the models and the GUIs.
+#
+#   metrics = Metrics()
+#   with metrics.timer('step'):
+#       model.step()
+#   metrics.summary()['step']['p99']
+#   metrics.export('runs/metrics.csv')
+#
+# A disabled Metrics hands out one shared no-op context manager, so
+# instrumented code costs a method call and an empty with-block.
+
+_NULL = contextlib.nullcontext()
+
+FIELDS = ('count', 'total', 'mean', 'min', 'p50', 'p90', 'p99', 'max')
+
+class LatencyHistogram:
+    # Log-spaced buckets, PER_OCTAVE per factor of two starting at 1 us,
+    # so quantiles are accurate to about 9% whatever the scale.  Count,
+    # total, min and max are exact.
+    PER_OCTAVE = 8
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def add(self, seconds):
+        i = max(0, math.ceil(math.log2(max(seconds, 1e-9) * 1e6) * self.PER_OCTAVE))
+        self.buckets[i] = self.buckets.get(i, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q):
+        # Upper edge of the bucket holding the q-th sample, capped at max.
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i in sorted(self.buckets):
+            seen += self.buckets[i]
+            if seen >= target:
+                return min(1e-6 * 2 ** (i / self.PER_OCTAVE), self.max)
+        return self.max
+
+    def summary(self):
+        return {'count': self.count, 'total': self.total,
+                'mean': self.total / self.count if self.count else 0.0,
+                'min': self.min if self.count else 0.0,
+                'p50': self.quantile(0.5), 'p90': self.quantile(0.9),
+                'p99': self.quantile(0.99), 'max': self.max}
+
+class _Timer:
+    __slots__ = ('metrics', 'phase', 'start', 'profiler')
+
+    def __init__(self, metrics, phase):
+        self.metrics = metrics
+        self.phase = phase
+        self.profiler = None
+
+    def __enter__(self):
+        capture = self.metrics._capture
+        if capture is not None and capture['phase'] == self.phase:
+            self.profiler = capture['profiler']
+            self.profiler.enable()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.metrics._captured()
+        self.metrics.record(self.phase, elapsed)
+        return False
+
+class Metrics:
+    # Latency histograms by phase name.  Safe to feed from a worker thread
+    # while another thread reads summary() or exports.
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.phases = {}
+        self.profile_report = None
+        self._lock = threading.Lock()
+        self._capture = None
+
+    def timer(self, phase):
+        if not self.enabled:
+            return _NULL
+        return _Timer(self, phase)
+
+    def record(self, phase, seconds):
+        with self._lock:
+            hist = self.phases.get(phase)
+            if hist is None:
+                hist = self.phases[phase] = LatencyHistogram()
+            hist.add(seconds)
+
+    def reset(self):
+        with self._lock:
+            self.phases = {}
+
+    def summary(self):
+        with self._lock:
+            return {phase: hist.summary() for phase, hist in self.phases.items()}
+
+    def text(self):
+        # One line per phase for the GUI panels: p50 / p99 in ms and count.
+        return '\n'.join(f"{phase}: {s['p50'] * 1e3:.2f} / {s['p99'] * 1e3:.2f} ms ({s['count']})"
+                         for phase, s in self.summary().items())
+
+    # ---------------- export ----------------
+    def to_json(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def to_csv(self, path):
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(('phase',) + FIELDS)
+            for phase, s in self.summary().items():
+                writer.writerow((phase,) + tuple(s[k] for k in FIELDS))
+
+    def export(self, path):
+        if str(path).lower().endswith('.csv'):
+            self.to_csv(path)
+        else:
+            self.to_json(path)
+
+    # ---------------- profiling ----------------
+    def profile(self, steps, phase='step', done=None, top=25):
+        # Runs cProfile inside the next `steps` timer(phase) blocks, then
+        # stores the report (sorted by cumulative time) in profile_report
+        # and passes it to done(report), from whichever thread ran them.
+        self.enabled = True
+        self.profile_report = None
+        self._capture = {'profiler': cProfile.Profile(), 'phase': phase, 'left': int(steps),
+                         'done': done, 'top': top}
+
+    def _captured(self):
+        capture = self._capture
+        if capture is None:
+            return
+        capture['left'] -= 1
+        if capture['left'] > 0:
+            return
+        self._capture = None
+        out = io.StringIO()
+        pstats.Stats(capture['profiler'], stream=out).sort_stats('cumulative').print_stats(capture['top'])
+        self.profile_report = out.getvalue()
+        if capture['done'] is not None:
+            capture['done'](self.profile_report)
\ No newline at end of file
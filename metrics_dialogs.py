@@ -0,0 +1,31 @@
+import tkinter as tk
+from tkinter import ttk, filedialog
+
+# Metrics export and cProfile report windows shared by the Tk apps.
+
+def export_metrics(metrics):
+    path = filedialog.asksaveasfilename(defaultextension='.json',
+                                        filetypes=[('JSON', '*.json'), ('CSV', '*.csv')])
+    if path:
+        metrics.export(path)
+
+def profile(root, metrics, calls, title, phase='step'):
+    # Profiles the next `calls` timer(phase) blocks and shows the report.
+    # done() may run on a worker thread, so the report is handed to Tk.
+    metrics.profile(calls, phase=phase, done=lambda report: root.after(0, show_report, root, title, report))
+
+def show_report(root, title, report):
+    # Read-only text window for a cProfile report, with a save button.
+    win = tk.Toplevel(root)
+    win.title(title)
+    ttk.Button(win, text='Guardar', command=lambda: save_report(report)).pack(fill='x')
+    text = tk.Text(win, width=110, height=35, font='TkFixedFont', wrap='none')
+    text.insert('1.0', report)
+    text.configure(state='disabled')
+    text.pack(fill='both', expand=True)
+
+def save_report(report):
+    path = filedialog.asksaveasfilename(defaultextension='.txt', filetypes=[('Texto', '*.txt')])
+    if path:
+        with open(path, 'w') as f:
+            f.write(report)
\ No newline at end of file
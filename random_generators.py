@@ -1,101 +1,299 @@
 import math
-import random
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 
+# Public sampler methods of RandomGenerators, for callers that pick one by name.
+SAMPLERS = ('uniform', 'exponential', 'erlang', 'gamma', 'normal', 'weibull', 'bernoulli', 'binomial', 'poisson')
+
+def _fill_by_rejection(size, propose, rate=1.0):
+    # propose(m) draws m candidates and returns the accepted ones.  Only the
+    # still-missing part of the output is re-proposed, oversampled by the
+    # expected rejection rate.
+    out = np.empty(size)
+    filled = 0
+    while filled < size:
+        need = size - filled
+        acc = propose(int(need / rate * 1.05) + 16)[:need]
+        out[filled:filled + len(acc)] = acc
+        filled += len(acc)
+    return out
+
+_LOG_FACT = np.array([math.lgamma(k + 1) for k in range(256)])
+
+def _log_factorial(k):
+    # log(k!) for integer-valued arrays: table below 256, Stirling above.
+    k = np.asarray(k, dtype=float)
+    out = np.empty_like(k)
+    small = k < 256
+    out[small] = _LOG_FACT[k[small].astype(np.int64)]
+    x = k[~small] + 1.0
+    inv = 1.0 / x
+    out[~small] = ((x - 0.5) * np.log(x) - x + 0.5 * math.log(2 * math.pi)
+                   + inv * (1.0 / 12 - inv * inv * (1.0 / 360 - inv * inv / 1260)))
+    return out
+
+def _invert_table(pmf, u):
+    # Inversion against a precomputed cdf: k is the first index with cdf > u.
+    cdf = np.cumsum(pmf)
+    return np.minimum(np.searchsorted(cdf, u, side='right'), len(cdf) - 1)
+
+class RandomStream:
+    # Root of a family of independent, reproducible generators.  Children
+    # are addressed by index (SeedSequence spawn keys), so the stream for a
+    # given index is the same no matter which thread or process asks for it.
+    def __init__(self, seed=None):
+        if isinstance(seed, np.random.SeedSequence):
+            self.seed_seq = seed
+        else:
+            self.seed_seq = np.random.SeedSequence(seed)
+
+    def child(self, i):
+        ss = np.random.SeedSequence(self.seed_seq.entropy, spawn_key=self.seed_seq.spawn_key + (i,))
+        return np.random.Generator(np.random.PCG64(ss))
+
+    def spawn(self, n):
+        return [self.child(i) for i in range(n)]
+
+    def jumped(self, i):
+        # Alternative split: one PCG64 sequence advanced by i * 2^127 steps.
+        return np.random.Generator(np.random.PCG64(self.seed_seq).jumped(i))
+
 class RandomGenerators:
+    # Shared default stream; every sampler also accepts its own Generator.
+    rng = np.random.default_rng()
+
+    @classmethod
+    def seed(cls, seed=None):
+        cls.rng = np.random.default_rng(seed)
+
+    @staticmethod
+    def _rng(rng):
+        return RandomGenerators.rng if rng is None else rng
+
+    @staticmethod
+    def generate_parallel(dist, size, params=None, workers=None, seed=None, chunk_size=1 << 20):
+        # Fills one output array in chunks of chunk_size from a thread pool.
+        # Chunk i always uses child i of the stream, so the result depends
+        # only on seed and chunk_size, not on workers or scheduling.
+        if dist not in SAMPLERS:
+            raise ValueError(f'unknown distribution {dist!r}, expected one of {SAMPLERS}')
+        sampler = getattr(RandomGenerators, dist)
+        params = params or {}
+        stream = seed if isinstance(seed, RandomStream) else RandomStream(seed)
+        size = int(size)
+        nchunks = max(1, -(-size // chunk_size))
+        first = sampler(size=min(chunk_size, size), rng=stream.child(0), **params)
+        out = np.empty(size, dtype=first.dtype)
+        out[:len(first)] = first
+
+        def fill(i):
+            lo = i * chunk_size
+            hi = min(lo + chunk_size, size)
+            out[lo:hi] = sampler(size=hi - lo, rng=stream.child(i), **params)
+
+        workers = workers or os.cpu_count() or 1
+        if workers <= 1:
+            for i in range(1, nchunks):
+                fill(i)
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(fill, range(1, nchunks)))
+        return out
+
     @staticmethod
-    def uniform(a=0.0, b=1.0, size=1):
-        u = np.random.random(size)
+    def uniform(a=0.0, b=1.0, size=1, rng=None):
+        u = RandomGenerators._rng(rng).random(int(size))
         return a + (b - a) * u
 
     @staticmethod
-    def exponential(lam=1.0, size=1):
-        u = np.random.random(size)
-        return -np.log(1 - u) / lam
+    def exponential(lam=1.0, size=1, rng=None):
+        u = RandomGenerators._rng(rng).random(int(size))
+        return -np.log1p(-u) / lam
 
     @staticmethod
-    def erlang(k=1, lam=1.0, size=1):
+    def erlang(k=1, lam=1.0, size=1, rng=None):
         if k <= 0:
             raise ValueError('k debe ser entero positivo')
-        u = np.random.random((size, k))
-        exps = -np.log(1 - u) / lam
+        u = RandomGenerators._rng(rng).random((int(size), k))
+        exps = -np.log1p(-u) / lam
         return np.sum(exps, axis=1)
 
     @staticmethod
-    def gamma(shape, scale=1.0, size=1):
+    def gamma(shape, scale=1.0, size=1, rng=None):
         size = int(size)
         a = shape
         if a <= 0:
             raise ValueError('shape must be > 0')
-        out = np.zeros(size)
-        for i in range(size):
-            if a < 1:
-                g = RandomGenerators.gamma(a + 1, scale=1.0, size=1)[0]
-                u = np.random.random()
-                out[i] = g * (u ** (1.0 / a))
-            else:
-                d = a - 1.0/3.0
-                c = 1.0 / math.sqrt(9.0 * d)
-                while True:
-                    x = np.random.normal()
-                    v = 1.0 + c * x
-                    if v <= 0:
-                        continue
-                    v = v**3
-                    u = np.random.random()
-                    if u < 1 - 0.0331 * (x**4):
-                        out[i] = d * v
-                        break
-                    if math.log(u) < 0.5 * x**2 + d * (1 - v + math.log(v)):
-                        out[i] = d * v
-                        break
-        return out * scale
+        rng = RandomGenerators._rng(rng)
+        if a < 1:
+            # Boost: Gamma(a) = Gamma(a + 1) * U^(1/a).
+            g = RandomGenerators.gamma(a + 1, scale=scale, size=size, rng=rng)
+            u = rng.random(size)
+            np.log(u, out=u)
+            u /= a
+            np.exp(u, out=u)
+            g *= u
+            return g
+
+        # Marsaglia-Tsang, evaluated on whole batches of candidates.
+        d = a - 1.0/3.0
+        c = 1.0 / math.sqrt(9.0 * d)
+
+        def propose(m):
+            x = RandomGenerators.normal(size=m, rng=rng)
+            v = c * x
+            v += 1.0
+            ok = v > 0
+            v3 = v * v
+            v3 *= v
+            x2 = x * x
+            # Squeeze test u < 1 - 0.0331 x^4 accepts almost everything; the
+            # log test only runs on the few candidates that fail it.
+            bound = x2 * x2
+            bound *= -0.0331
+            bound += 1.0
+            u = rng.random(m)
+            accept = u < bound
+            accept &= ok
+            slow = np.nonzero(ok & ~accept)[0]
+            vs = v3[slow]
+            accept[slow] = np.log(u[slow]) < 0.5 * x2[slow] + d * (1 - vs + np.log(vs))
+            out = v3[accept]
+            out *= d
+            return out
+
+        return _fill_by_rejection(size, propose, rate=0.95) * scale
 
     @staticmethod
-    def normal(mu=0.0, sigma=1.0, size=1):
+    def normal(mu=0.0, sigma=1.0, size=1, rng=None):
+        # Box-Muller: each pair of uniforms gives two independent normals.
         size = int(size)
-        out = np.zeros(size)
-        i = 0
-        while i < size:
-            u1 = random.random()
-            u2 = random.random()
-            z0 = math.sqrt(-2.0 * math.log(u1)) * math.cos(2 * math.pi * u2)
-            z1 = math.sqrt(-2.0 * math.log(u1)) * math.sin(2 * math.pi * u2)
-            out[i] = mu + sigma * z0
-            i += 1
-            if i < size:
-                out[i] = mu + sigma * z1
-                i += 1
+        half = (size + 1) // 2
+        rng = RandomGenerators._rng(rng)
+        # r = sqrt(-2 log(1 - u1)), computed in place.
+        r = rng.random(half)
+        np.negative(r, out=r)
+        np.log1p(r, out=r)
+        r *= -2.0
+        np.sqrt(r, out=r)
+        theta = rng.random(half)
+        theta *= 2 * math.pi
+        out = np.empty(2 * half)
+        np.cos(theta, out=out[:half])
+        np.sin(theta, out=out[half:])
+        out[:half] *= r
+        out[half:] *= r
+        out = out[:size]
+        out *= sigma
+        out += mu
         return out
 
     @staticmethod
-    def weibull(k=1.0, lam=1.0, size=1):
-        u = np.random.random(int(size))
-        return lam * ((-np.log(1 - u)) ** (1.0 / k))
+    def weibull(k=1.0, lam=1.0, size=1, rng=None):
+        u = RandomGenerators._rng(rng).random(int(size))
+        return lam * ((-np.log1p(-u)) ** (1.0 / k))
 
     @staticmethod
-    def bernoulli(p=0.5, size=1):
-        u = np.random.random(int(size))
+    def bernoulli(p=0.5, size=1, rng=None):
+        u = RandomGenerators._rng(rng).random(int(size))
         return (u < p).astype(int)
 
     @staticmethod
-    def binomial(n=1, p=0.5, size=1):
+    def binomial(n=1, p=0.5, size=1, rng=None):
         size = int(size)
-        out = np.zeros(size, dtype=int)
-        for i in range(n):
-            out += RandomGenerators.bernoulli(p, size=size)
-        return out
+        n = int(n)
+        if n < 0 or not 0 <= p <= 1:
+            raise ValueError('n must be >= 0 and 0 <= p <= 1')
+        rng = RandomGenerators._rng(rng)
+        # Sample with q = min(p, 1 - p) and reflect at the end.
+        flip = p > 0.5
+        q = 1 - p if flip else p
+        if n == 0 or q == 0:
+            out = np.zeros(size, dtype=np.int64)
+        elif n * q < 10:
+            # Small mean: inversion over the pmf, built with the ratio
+            # pmf(k + 1) / pmf(k) = (n - k) / (k + 1) * q / (1 - q).
+            kmax = int(min(n, n * q + 10 * math.sqrt(n * q) + 30))
+            k = np.arange(kmax)
+            ratio = (n - k) / (k + 1) * (q / (1 - q))
+            pmf = np.empty(kmax + 1)
+            pmf[0] = math.exp(n * math.log1p(-q))
+            pmf[1:] = pmf[0] * np.cumprod(ratio)
+            out = _invert_table(pmf, rng.random(size))
+        else:
+            out = RandomGenerators._btrs(n, q, size, rng)
+        return n - out if flip else out
 
     @staticmethod
-    def poisson(lam=1.0, size=1):
+    def _btrs(n, p, size, rng):
+        # Hormann's transformed rejection with squeeze (BTRS), for n * p >= 10.
+        spq = math.sqrt(n * p * (1 - p))
+        b = 1.15 + 2.53 * spq
+        a = -0.0873 + 0.0248 * b + 0.01 * p
+        c = n * p + 0.5
+        vr = 0.92 - 4.2 / b
+        alpha = (2.83 + 5.1 / b) * spq
+        lpq = math.log(p / (1 - p))
+        m = math.floor((n + 1) * p)
+        h = _log_factorial(m) + _log_factorial(n - m)
+
+        def propose(size):
+            u = rng.random(size) - 0.5
+            v = rng.random(size)
+            us = 0.5 - np.abs(u)
+            k = np.floor((2 * a / us + b) * u + c)
+            inside = (k >= 0) & (k <= n)
+            accept = inside & (us >= 0.07) & (v <= vr)
+            slow = np.nonzero(inside & ~accept)[0]
+            ks, uss = k[slow], us[slow]
+            lv = np.log(v[slow] * alpha / (a / (uss * uss) + b))
+            accept[slow] = lv <= h - _log_factorial(ks) - _log_factorial(n - ks) + (ks - m) * lpq
+            return k[accept]
+
+        return _fill_by_rejection(size, propose, rate=0.75).astype(np.int64)
+
+    @staticmethod
+    def poisson(lam=1.0, size=1, rng=None):
         size = int(size)
-        out = np.zeros(size, dtype=int)
-        for i in range(size):
-            L = math.exp(-lam)
-            k = 0
-            p = 1.0
-            while p > L:
-                k += 1
-                p *= random.random()
-            out[i] = k - 1
-        return out
\ No newline at end of file
+        if lam < 0:
+            raise ValueError('lam must be >= 0')
+        rng = RandomGenerators._rng(rng)
+        if lam == 0:
+            return np.zeros(size, dtype=np.int64)
+        if lam < 10:
+            # Small mean: inversion over the pmf, truncated where the
+            # remaining tail mass is below double precision.
+            kmax = int(lam + 10 * math.sqrt(lam) + 30)
+            k = np.arange(1, kmax + 1)
+            pmf = np.empty(kmax + 1)
+            pmf[0] = math.exp(-lam)
+            pmf[1:] = pmf[0] * np.cumprod(lam / k)
+            return _invert_table(pmf, rng.random(size))
+        return RandomGenerators._ptrs(lam, size, rng)
+
+    @staticmethod
+    def _ptrs(lam, size, rng):
+        # Hormann's transformed rejection with squeeze (PTRS), for lam >= 10.
+        # Works in log space, so there is no exp(-lam) underflow.
+        slam = math.sqrt(lam)
+        loglam = math.log(lam)
+        b = 0.931 + 2.53 * slam
+        a = -0.059 + 0.02483 * b
+        invalpha = 1.1239 + 1.1328 / (b - 3.4)
+        vr = 0.9277 - 3.6224 / (b - 2)
+
+        def propose(size):
+            u = rng.random(size) - 0.5
+            v = rng.random(size)
+            us = 0.5 - np.abs(u)
+            k = np.floor((2 * a / us + b) * u + lam + 0.43)
+            accept = (us >= 0.07) & (v <= vr)
+            slow = np.nonzero(~accept & (k >= 0) & ((us >= 0.013) | (v <= us)))[0]
+            ks, uss = k[slow], us[slow]
+            lhs = np.log(v[slow] * invalpha / (a / (uss * uss) + b))
+            accept[slow] = lhs <= -lam + ks * loglam - _log_factorial(ks)
+            return k[accept]
+
+        return _fill_by_rejection(size, propose, rate=0.85).astype(np.int64)
\ No newline at end of file
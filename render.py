@@ -0,0 +1,91 @@
+import time
+from collections import deque
+
+from instrumentation import Metrics
+
+class RateMeter:
+    # Events per second over a sliding time window.
+    def __init__(self, window=1.0):
+        self.window = window
+        self._events = deque()
+        self._total = 0
+
+    def tick(self, n=1):
+        now = time.perf_counter()
+        self._events.append((now, n))
+        self._total += n
+        self._trim(now)
+
+    def _trim(self, now):
+        while self._events and now - self._events[0][0] > self.window:
+            self._total -= self._events.popleft()[1]
+
+    @property
+    def rate(self):
+        now = time.perf_counter()
+        self._trim(now)
+        if not self._events:
+            return 0.0
+        span = max(now - self._events[0][0], 1e-3)
+        return self._total / span if len(self._events) > 1 else 0.0
+
+class BlitRenderer:
+    # Draws a fixed set of animated artists on top of a cached background.
+    # Artists are created once and updated with set_data by the caller;
+    # render() only restores the background, redraws those artists and
+    # blits, and skips the frame entirely if it comes sooner than 1/fps
+    # after the previous one.  invalidate() forces a full redraw (needed
+    # when axes limits or other static parts change).  Frames actually
+    # drawn are timed into `metrics` as 'draw'.
+    def __init__(self, canvas, fps=30, metrics=None):
+        self.canvas = canvas
+        self.metrics = metrics if metrics is not None else Metrics(enabled=False)
+        self.figure = canvas.figure
+        self.min_interval = 1.0 / fps
+        self.artists = []
+        self.steps = RateMeter()
+        self.frames = RateMeter()
+        self._background = None
+        self._last = 0.0
+        canvas.mpl_connect('draw_event', self._on_draw)
+
+    def add(self, artist):
+        artist.set_animated(True)
+        self.artists.append(artist)
+        return artist
+
+    def clear(self):
+        self.artists = []
+        self._background = None
+
+    def _on_draw(self, event):
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_artists()
+
+    def _draw_artists(self):
+        for artist in self.artists:
+            self.figure.draw_artist(artist)
+
+    def invalidate(self):
+        self._background = None
+        self.canvas.draw()
+
+    def due(self):
+        return time.perf_counter() - self._last >= self.min_interval
+
+    def render(self, force=False):
+        if not force and not self.due():
+            return False
+        with self.metrics.timer('draw'):
+            if self._background is None:
+                self.canvas.draw()
+            else:
+                self.canvas.restore_region(self._background)
+                self._draw_artists()
+                self.canvas.blit(self.figure.bbox)
+        self._last = time.perf_counter()
+        self.frames.tick()
+        return True
+
+    def status(self):
+        return f'{self.steps.rate:.1f} pasos/s · {self.frames.rate:.1f} fps'
\ No newline at end of file
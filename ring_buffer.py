@@ -0,0 +1,68 @@
+import numpy as np
+
+class RingHistory:
+    # Fixed-capacity history of 1D rows.  Every row is written twice, at pos
+    # and pos + depth, so the last `depth` rows are always one contiguous
+    # slice of the buffer and view() never copies.
+    def __init__(self, depth, width, dtype=np.uint8):
+        if depth < 1:
+            raise ValueError('depth must be >= 1')
+        self.depth = depth
+        self.width = width
+        self._buf = np.zeros((2 * depth, width), dtype=dtype)
+        self._pos = 0
+        self.count = 0
+        # Rows pushed since the last clear(), including overwritten ones.
+        self.total = 0
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def nbytes(self):
+        return self._buf.nbytes
+
+    def push(self, row):
+        self._buf[self._pos] = row
+        self._buf[self._pos + self.depth] = row
+        self._pos = (self._pos + 1) % self.depth
+        self.count = min(self.count + 1, self.depth)
+        self.total += 1
+
+    def view(self):
+        # Rows ordered oldest to newest.
+        end = self._pos + self.depth
+        return self._buf[end - self.count:end]
+
+    def clear(self):
+        self._pos = 0
+        self.count = 0
+        self.total = 0
+
+class GrowingHistory:
+    # Append-only table of fixed-width rows backed by a preallocated array
+    # that doubles its capacity when full, so appends are amortized O(1).
+    def __init__(self, width, dtype=np.int64, capacity=256):
+        self._buf = np.zeros((capacity, width), dtype=dtype)
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def nbytes(self):
+        return self._buf.nbytes
+
+    def append(self, row):
+        if self.count == len(self._buf):
+            grown = np.zeros((2 * len(self._buf), self._buf.shape[1]), dtype=self._buf.dtype)
+            grown[:self.count] = self._buf
+            self._buf = grown
+        self._buf[self.count] = row
+        self.count += 1
+
+    def view(self):
+        return self._buf[:self.count]
+
+    def clear(self):
+        self.count = 0
\ No newline at end of file
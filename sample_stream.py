@@ -0,0 +1,96 @@
+import numpy as np
+
+from random_generators import RandomGenerators, RandomStream
+
+def iter_chunks(dist, n, params=None, chunk_size=1 << 20, seed=None):
+    # Yields n samples of dist in chunks of at most chunk_size.  Chunk i is
+    # drawn from child i of the stream, so concatenating the chunks gives the
+    # same array as RandomGenerators.generate_parallel with the same seed.
+    sampler = getattr(RandomGenerators, dist)
+    params = params or {}
+    stream = seed if isinstance(seed, RandomStream) else RandomStream(seed)
+    n = int(n)
+    for i, lo in enumerate(range(0, n, chunk_size)):
+        yield sampler(size=min(chunk_size, n - lo), rng=stream.child(i), **params)
+
+class StreamingStats:
+    # Statistics updated one chunk at a time with memory independent of the
+    # number of samples: fixed-bin histogram (with under/overflow counts),
+    # count, mean and variance (Chan's parallel update), min/max and a
+    # uniform reservoir sample used as a quantile sketch.
+    def __init__(self, bins=50, edges=None, reservoir=10000, seed=None):
+        self.bins = bins
+        self.edges = None if edges is None else np.asarray(edges, dtype=float)
+        self.hist = None if edges is None else np.zeros(len(self.edges) - 1, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self._reservoir = np.empty(reservoir)
+        self._rng = np.random.default_rng(seed)
+
+    def fit_edges(self, sample):
+        # Fixes the edges from a sample: one bin per integer for narrow
+        # integer data, otherwise the observed range padded by 10%.
+        # update() uses the first chunk when no edges were set; a larger
+        # pilot sample leaves fewer later samples out of range.
+        sample = np.asarray(sample).ravel()
+        lo, hi = float(sample.min()), float(sample.max())
+        if np.issubdtype(sample.dtype, np.integer) and hi - lo + 1 <= max(self.bins, 100):
+            self.edges = np.arange(lo, hi + 2) - 0.5
+        else:
+            pad = 0.1 * (hi - lo) or 0.5
+            self.edges = np.linspace(lo - pad, hi + pad, self.bins + 1)
+        self.hist = np.zeros(len(self.edges) - 1, dtype=np.int64)
+
+    def update(self, chunk):
+        chunk = np.asarray(chunk).ravel()
+        m = len(chunk)
+        if m == 0:
+            return
+        if self.edges is None:
+            self.fit_edges(chunk)
+        counts, _ = np.histogram(chunk, bins=self.edges)
+        self.hist += counts
+        self.underflow += int(np.count_nonzero(chunk < self.edges[0]))
+        self.overflow += int(np.count_nonzero(chunk > self.edges[-1]))
+
+        c_mean = float(chunk.mean())
+        c_m2 = float(((chunk - c_mean) ** 2).sum())
+        total = self.count + m
+        delta = c_mean - self.mean
+        self.mean += delta * m / total
+        self._m2 += c_m2 + delta * delta * self.count * m / total
+        self.min = min(self.min, float(chunk.min()))
+        self.max = max(self.max, float(chunk.max()))
+
+        # Reservoir sampling: item number i is kept with probability k/(i+1).
+        k = len(self._reservoir)
+        fill = min(max(k - self.count, 0), m)
+        self._reservoir[self.count:self.count + fill] = chunk[:fill]
+        if fill < m:
+            idx = np.arange(self.count + fill, total)
+            slots = (self._rng.random(len(idx)) * (idx + 1)).astype(np.int64)
+            keep = slots < k
+            self._reservoir[slots[keep]] = chunk[fill:][keep]
+        self.count = total
+
+    @property
+    def outside(self):
+        # Samples counted but not in the histogram.
+        return self.underflow + self.overflow
+
+    @property
+    def variance(self):
+        return self._m2 / self.count if self.count else float('nan')
+
+    def quantile(self, q):
+        return np.quantile(self._reservoir[:min(self.count, len(self._reservoir))], q)
+
+    def density(self):
+        # Histogram normalized like ax.hist(..., density=True).
+        widths = np.diff(self.edges)
+        return self.hist / (max(self.count, 1) * widths)
\ No newline at end of file
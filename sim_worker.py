@@ -0,0 +1,103 @@
+import queue
+import threading
+import time
+
+from instrumentation import Metrics
+
+class SimulationWorker:
+    # Steps a model in a background thread and publishes snapshots through a
+    # small bounded queue.  When the queue is full the oldest snapshot is
+    # dropped, so a slow consumer only ever sees the most recent state and
+    # never holds the model back.  snapshot(model) must return data that the
+    # worker will not mutate afterwards (copies, or views of append-only
+    # buffers).  Anyone touching the model from another thread while the
+    # worker runs must hold `lock`.  The run ends early once until(model)
+    # is true, e.g. when the model reports a steady state.  Steps and
+    # snapshots are timed into `metrics` as 'step' and 'snapshot'.
+    def __init__(self, model, snapshot, max_rate=None, max_steps=None, publish_rate=60, queue_size=2, until=None,
+                 metrics=None):
+        self.model = model
+        self.snapshot = snapshot
+        self.max_rate = max_rate
+        self.max_steps = max_steps
+        self.until = until
+        self.metrics = metrics if metrics is not None else Metrics(enabled=False)
+        self.publish_interval = 1.0 / publish_rate
+        self.lock = threading.Lock()
+        self.steps = 0
+        self.error = None
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=1.0):
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    @property
+    def alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _publish(self):
+        with self.metrics.timer('snapshot'):
+            snap = self.snapshot(self.model)
+        snap['steps'] = self.steps
+        while True:
+            try:
+                self._queue.put_nowait(snap)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def _run(self):
+        last_publish = 0.0
+        next_step = time.perf_counter()
+        try:
+            while not self._stop.is_set():
+                if self.max_steps is not None and self.steps >= self.max_steps:
+                    break
+                with self.lock:
+                    with self.metrics.timer('step'):
+                        self.model.step()
+                    self.steps += 1
+                    if self.until is not None and self.until(self.model):
+                        break
+                    now = time.perf_counter()
+                    if now - last_publish >= self.publish_interval:
+                        self._publish()
+                        last_publish = now
+                if self.max_rate:
+                    next_step += 1.0 / self.max_rate
+                    delay = next_step - time.perf_counter()
+                    if delay > 0:
+                        self._stop.wait(delay)
+                    else:
+                        next_step = time.perf_counter()
+        except Exception as e:
+            self.error = e
+        finally:
+            # Always leave the final state for the consumer.
+            try:
+                with self.lock:
+                    self._publish()
+            except Exception as e:
+                self.error = self.error or e
+
+    def latest(self):
+        # Newest pending snapshot, or None if nothing new was published.
+        snap = None
+        while True:
+            try:
+                snap = self._queue.get_nowait()
+            except queue.Empty:
+                return snap
\ No newline at end of file
@@ -1,7 +1,6 @@
+import contextlib
 import tkinter as tk
 from tkinter import ttk, messagebox
-import threading
-import time
 import numpy as np
 import matplotlib
 matplotlib.use('TkAgg')
@@ -12,6 +11,15 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from game_of_life_2d import GameOfLife2D
 from game_of_life_1d import GameOfLife1D
 from covid_simulation import CovidSimulation
+from instrumentation import Metrics
+from metrics_dialogs import export_metrics, profile
+from render import BlitRenderer
+from ring_buffer import RingHistory
+from sim_worker import SimulationWorker
+
+POLL_MS = 15
+CYCLE_WINDOW = 64
+PROFILE_STEPS = 200
 
 class SimulacionesApp:
     def __init__(self, root):
@@ -26,6 +34,94 @@ class SimulacionesApp:
         self._build_gameoflife1d_tab()
         self._build_covid_tab()
 
+    # ---------------- Ejecución en segundo plano ----------------
+    @staticmethod
+    def _model_lock(worker):
+        # The model may only be touched from the Tk thread while holding the
+        # worker's lock (or when no worker is running).
+        if worker is not None and worker.alive:
+            return worker.lock
+        return contextlib.nullcontext()
+
+    @staticmethod
+    def _stop_worker(worker):
+        # Stops the worker and drains its queue.  Returns the final snapshot
+        # it left behind (or None) for the caller to draw or drop.
+        if worker is None:
+            return None
+        worker.stop()
+        return worker.latest()
+
+    @staticmethod
+    def _max_rate(var):
+        rate = float(var.get())
+        return rate if rate > 0 else None
+
+    @staticmethod
+    def _until_steady(model):
+        return model.steady_state() is not None
+
+    @staticmethod
+    def _status_text(renderer, snap):
+        text = renderer.status()
+        steady = snap.get('steady') if snap else None
+        if steady is None:
+            return text
+        if steady['kind'] == 'extinct':
+            return f"{text} · extinción en t={steady['since']}"
+        if steady['kind'] == 'fixed':
+            return f"{text} · punto fijo desde t={steady['since']}"
+        return f"{text} · ciclo de periodo {steady['period']} desde t={steady['since']}"
+
+    def _show_status(self, renderer, status, panel, snap):
+        status.set(self._status_text(renderer, snap))
+        panel.set(renderer.metrics.text())
+
+    def _watch(self, worker, current, renderer, apply, status, panel, name):
+        # Polls the worker from the Tk main loop: applies only the newest
+        # snapshot, renders at the renderer's frame rate and reschedules
+        # itself while the worker is alive.  Once current() returns another
+        # worker (the run was stopped or the model replaced) it ends without
+        # applying anything, as the artists may belong to a new model.
+        seen = [0]
+        pending = [False]
+        last = [None]
+
+        def poll():
+            if current() is not worker:
+                return
+            alive = worker.alive
+            snap = worker.latest()
+            if snap is not None:
+                renderer.steps.tick(snap['steps'] - seen[0])
+                seen[0] = snap['steps']
+                apply(snap)
+                last[0] = snap
+                pending[0] = True
+            if pending[0] and renderer.render(force=not alive):
+                pending[0] = False
+                self._show_status(renderer, status, panel, last[0])
+            if worker.error is not None:
+                print(f'Error en loop {name}:', worker.error)
+            if alive:
+                self.root.after(POLL_MS, poll)
+        self.root.after(POLL_MS, poll)
+
+    # ---------------- Métricas ----------------
+    def _build_metrics_panel(self, parent, metrics):
+        # Live p50 / p99 latency per phase, export and a cProfile capture
+        # of the next PROFILE_STEPS steps, shown in its own window.
+        box = ttk.LabelFrame(parent, text='Métricas (p50 / p99)')
+        box.pack(fill='x', pady=(10, 0))
+        panel = tk.StringVar(value='')
+        ttk.Label(box, textvariable=panel, font='TkFixedFont', justify='left').pack(anchor='w')
+        ttk.Button(box, text='Exportar métricas', command=lambda: export_metrics(metrics)).pack(fill='x')
+        ttk.Button(box, text=f'Perfilar {PROFILE_STEPS} pasos', command=lambda: self._profile(metrics)).pack(fill='x')
+        return panel
+
+    def _profile(self, metrics):
+        profile(self.root, metrics, PROFILE_STEPS, f'Perfil de {PROFILE_STEPS} pasos')
+
     # ---------------- Game of Life 2D ----------------
     def _build_gameoflife_tab(self):
         tab = ttk.Frame(self.nb)
@@ -45,61 +141,104 @@ class SimulacionesApp:
         ttk.Label(left, text='Prob. vivo inicial:').pack(anchor='w')
         self.g2_p = tk.DoubleVar(value=0.2)
         ttk.Entry(left, textvariable=self.g2_p).pack(fill='x')
+        ttk.Label(left, text='Regla (B/S):').pack(anchor='w')
+        self.g2_rule = tk.StringVar(value='B3/S23')
+        ttk.Entry(left, textvariable=self.g2_rule).pack(fill='x')
+        ttk.Label(left, text='Máx. pasos/s (0 = sin límite):').pack(anchor='w')
+        self.g2_rate = tk.DoubleVar(value=0)
+        ttk.Entry(left, textvariable=self.g2_rate).pack(fill='x')
 
         ttk.Button(left, text='Crear aleatorio', command=self._g2_create_random).pack(fill='x', pady=5)
         ttk.Button(left, text='Paso', command=self._g2_step).pack(fill='x')
         ttk.Button(left, text='Ejecutar/Parar', command=self._g2_toggle_run).pack(fill='x', pady=5)
         ttk.Button(left, text='Limpiar', command=self._g2_clear).pack(fill='x')
+        self.g2_status = tk.StringVar(value='')
+        ttk.Label(left, textvariable=self.g2_status).pack(anchor='w', pady=(10,0))
+        self.g2_metrics = Metrics()
+        self.g2_panel = self._build_metrics_panel(left, self.g2_metrics)
 
         fig = Figure(figsize=(6,6))
         self.g2_ax = fig.add_subplot(111)
         self.g2_canvas = FigureCanvasTkAgg(fig, master=right)
         self.g2_canvas.get_tk_widget().pack(fill='both', expand=True)
+        self.g2_render = BlitRenderer(self.g2_canvas, metrics=self.g2_metrics)
 
         self.g2 = None
-        self.g2_running = False
+        self.g2_img = None
+        self.g2_worker = None
+
+    def _g2_stop(self):
+        worker, self.g2_worker = self.g2_worker, None
+        return self._stop_worker(worker)
 
     def _g2_create_random(self):
+        self._g2_stop()
         rows = max(5, int(self.g2_rows.get()))
         cols = max(5, int(self.g2_cols.get()))
         p = float(self.g2_p.get())
-        self.g2 = GameOfLife2D(rows=rows, cols=cols)
+        try:
+            model = GameOfLife2D(rows=rows, cols=cols, rule=self.g2_rule.get(), cycle_window=CYCLE_WINDOW)
+        except ValueError as e:
+            messagebox.showerror('Error', str(e))
+            return
+        self.g2 = model
         self.g2.randomize(p=p)
-        self._g2_draw()
-
-    def _g2_draw(self):
         self.g2_ax.clear()
-        self.g2_ax.imshow(self.g2.grid, interpolation='nearest')
-        self.g2_ax.set_title('Juego de la Vida 2D')
-        self.g2_canvas.draw()
+        self.g2_render.clear()
+        self.g2_img = self.g2_render.add(self.g2_ax.imshow(self.g2.grid, interpolation='nearest', vmin=0, vmax=1))
+        self.g2_ax.set_title(f'Juego de la Vida 2D ({self.g2.rule})')
+        self.g2_render.invalidate()
+        self._g2_draw(self._g2_snapshot(self.g2), force=True)
+
+    @staticmethod
+    def _g2_snapshot(model):
+        return {'grid': model.grid.copy(), 'steady': model.steady_state()}
+
+    def _g2_apply(self, snap):
+        self.g2_img.set_data(snap['grid'])
+
+    def _g2_draw(self, snap, force=False):
+        self._g2_apply(snap)
+        if self.g2_render.render(force):
+            self._show_status(self.g2_render, self.g2_status, self.g2_panel, snap)
 
     def _g2_step(self):
         if self.g2 is None:
             self._g2_create_random()
-        self.g2.step()
-        self._g2_draw()
+            if self.g2 is None:
+                return
+        with self._model_lock(self.g2_worker):
+            with self.g2_metrics.timer('step'):
+                self.g2.step()
+            snap = self._g2_snapshot(self.g2)
+        self.g2_render.steps.tick()
+        self._g2_draw(snap, force=True)
 
     def _g2_toggle_run(self):
-        self.g2_running = not self.g2_running
-        if self.g2_running:
-            self._g2_run_loop()
-
-    def _g2_run_loop(self):
-        def loop():
-            while self.g2_running:
-                time.sleep(0.1)
-                try:
-                    self._g2_step()
-                except Exception as e:
-                    print('Error en loop GOL2D:', e)
-                    self.g2_running = False
-        threading.Thread(target=loop, daemon=True).start()
+        if self.g2_worker is not None and self.g2_worker.alive:
+            snap = self._g2_stop()
+            if snap is not None:
+                self._g2_draw(snap, force=True)
+            return
+        if self.g2 is None:
+            self._g2_create_random()
+            if self.g2 is None:
+                return
+        self.g2_worker = SimulationWorker(self.g2, self._g2_snapshot, max_rate=self._max_rate(self.g2_rate),
+                                          until=self._until_steady, metrics=self.g2_metrics).start()
+        self._watch(self.g2_worker, lambda: self.g2_worker, self.g2_render, self._g2_apply,
+                    self.g2_status, self.g2_panel, 'GOL2D')
 
     def _g2_clear(self):
         if self.g2 is None:
             self._g2_create_random()
-        self.g2.grid = np.zeros_like(self.g2.grid)
-        self._g2_draw()
+            if self.g2 is None:
+                return
+        with self._model_lock(self.g2_worker):
+            self.g2.grid = np.zeros_like(self.g2.grid)
+            self.g2.cycles.clear()
+            snap = self._g2_snapshot(self.g2)
+        self._g2_draw(snap, force=True)
 
     # ---------------- Game of Life 1D ----------------
     def _build_gameoflife1d_tab(self):
@@ -117,48 +256,98 @@ class SimulacionesApp:
         ttk.Label(left, text='Regla (0-255):').pack(anchor='w')
         self.g1_rule = tk.IntVar(value=30)
         ttk.Entry(left, textvariable=self.g1_rule).pack(fill='x')
+        ttk.Label(left, text='Historia (filas):').pack(anchor='w')
+        self.g1_depth = tk.IntVar(value=200)
+        ttk.Entry(left, textvariable=self.g1_depth).pack(fill='x')
+        ttk.Label(left, text='Máx. pasos/s (0 = sin límite):').pack(anchor='w')
+        self.g1_rate = tk.DoubleVar(value=0)
+        ttk.Entry(left, textvariable=self.g1_rate).pack(fill='x')
         ttk.Button(left, text='Crear', command=self._g1_create).pack(fill='x', pady=5)
         ttk.Button(left, text='Siguiente', command=self._g1_step).pack(fill='x')
         ttk.Button(left, text='Ejecutar', command=self._g1_run).pack(fill='x', pady=5)
+        self.g1_status = tk.StringVar(value='')
+        ttk.Label(left, textvariable=self.g1_status).pack(anchor='w', pady=(10,0))
+        self.g1_metrics = Metrics()
+        self.g1_panel = self._build_metrics_panel(left, self.g1_metrics)
 
         fig = Figure(figsize=(8,5))
         self.g1_ax = fig.add_subplot(111)
         self.g1_canvas = FigureCanvasTkAgg(fig, master=right)
         self.g1_canvas.get_tk_widget().pack(fill='both', expand=True)
+        self.g1_render = BlitRenderer(self.g1_canvas, metrics=self.g1_metrics)
 
         self.g1 = None
-        self.g1_history = []
+        self.g1_img = None
+        self.g1_worker = None
+
+    def _g1_stop(self):
+        worker, self.g1_worker = self.g1_worker, None
+        return self._stop_worker(worker)
 
     def _g1_create(self):
+        self._g1_stop()
         length = max(10, int(self.g1_length.get()))
         rule = min(255, max(0, int(self.g1_rule.get())))
-        self.g1 = GameOfLife1D(length=length, rule=rule)
+        depth = max(1, int(self.g1_depth.get()))
+        self.g1 = GameOfLife1D(length=length, rule=rule, history_depth=depth, cycle_window=CYCLE_WINDOW)
         self.g1.reset()
-        self.g1_history = [self.g1.state.copy()]
-        self._g1_draw()
+        # Tk-side copy of the history, fed with the rows each snapshot adds.
+        self.g1_view = RingHistory(depth, length)
+        self.g1_seen = 0
+        self.g1_ax.clear()
+        self.g1_render.clear()
+        self.g1_img = self.g1_render.add(self.g1_ax.imshow(self.g1.history.view(), aspect='auto', interpolation='nearest', vmin=0, vmax=1))
+        # Axes limits stay at the full history depth so the background
+        # cached for blitting is valid while the history fills up.
+        self.g1_ax.set_xlim(-0.5, length - 0.5)
+        self.g1_ax.set_ylim(depth - 0.5, -0.5)
+        self.g1_ax.set_autoscale_on(False)
+        self.g1_ax.set_title(f'Autómata 1D (Regla {self.g1.rule})')
+        self.g1_render.invalidate()
+        self._g1_draw(self._g1_snapshot(self.g1), force=True)
+
+    def _g1_snapshot(self, model):
+        # The ring buffer is overwritten in place, so rows are copied, but
+        # only those the Tk side has not applied yet: rows start..end-1 in
+        # push order.  A dropped snapshot loses nothing, the next one
+        # starts from the same point.
+        hist = model.history
+        start = max(self.g1_seen, hist.total - len(hist))
+        rows = hist.view()[len(hist) - (hist.total - start):].copy()
+        return {'rows': rows, 'start': start, 'end': hist.total, 'steady': model.steady_state()}
+
+    def _g1_apply(self, snap):
+        # Snapshots may overlap with rows already applied.
+        for row in snap['rows'][max(0, self.g1_seen - snap['start']):]:
+            self.g1_view.push(row)
+        self.g1_seen = max(self.g1_seen, snap['end'])
+        img = self.g1_view.view()
+        self.g1_img.set_data(img)
+        self.g1_img.set_extent((-0.5, img.shape[1] - 0.5, img.shape[0] - 0.5, -0.5))
+
+    def _g1_draw(self, snap, force=False):
+        self._g1_apply(snap)
+        if self.g1_render.render(force):
+            self._show_status(self.g1_render, self.g1_status, self.g1_panel, snap)
 
     def _g1_step(self):
         if self.g1 is None:
             self._g1_create()
-        self.g1.step()
-        self.g1_history.append(self.g1.state.copy())
-        if len(self.g1_history) > 200:
-            self.g1_history.pop(0)
-        self._g1_draw()
-
-    def _g1_draw(self):
-        self.g1_ax.clear()
-        img = np.array(self.g1_history)
-        self.g1_ax.imshow(img, aspect='auto', interpolation='nearest')
-        self.g1_ax.set_title(f'Autómata 1D (Regla {self.g1.rule})')
-        self.g1_canvas.draw()
+        with self._model_lock(self.g1_worker):
+            with self.g1_metrics.timer('step'):
+                self.g1.step()
+            snap = self._g1_snapshot(self.g1)
+        self.g1_render.steps.tick()
+        self._g1_draw(snap, force=True)
 
     def _g1_run(self):
-        def run_loop():
-            for _ in range(200):
-                time.sleep(0.05)
-                self._g1_step()
-        threading.Thread(target=run_loop, daemon=True).start()
+        if self.g1 is None:
+            self._g1_create()
+        self._g1_stop()
+        self.g1_worker = SimulationWorker(self.g1, self._g1_snapshot, max_rate=self._max_rate(self.g1_rate), max_steps=200,
+                                          until=self._until_steady, metrics=self.g1_metrics).start()
+        self._watch(self.g1_worker, lambda: self.g1_worker, self.g1_render, self._g1_apply,
+                    self.g1_status, self.g1_panel, 'GOL1D')
 
     # ---------------- COVID Tab ----------------
     def _build_covid_tab(self):
@@ -189,22 +378,36 @@ class SimulacionesApp:
         ttk.Label(left, text='P(die) por paso:').pack(anchor='w')
         self.cv_pdie = tk.DoubleVar(value=0.005)
         ttk.Entry(left, textvariable=self.cv_pdie).pack(fill='x')
+        ttk.Label(left, text='Máx. pasos/s (0 = sin límite):').pack(anchor='w')
+        self.cv_rate = tk.DoubleVar(value=0)
+        ttk.Entry(left, textvariable=self.cv_rate).pack(fill='x')
 
         ttk.Button(left, text='Crear simulación', command=self._cv_create).pack(fill='x', pady=5)
         ttk.Button(left, text='Paso', command=self._cv_step).pack(fill='x')
         ttk.Button(left, text='Ejecutar/Parar', command=self._cv_toggle_run).pack(fill='x', pady=5)
+        self.cv_status = tk.StringVar(value='')
+        ttk.Label(left, textvariable=self.cv_status).pack(anchor='w', pady=(10,0))
+        self.cv_metrics = Metrics()
+        self.cv_panel = self._build_metrics_panel(left, self.cv_metrics)
 
         fig = Figure(figsize=(7,6))
         self.cv_ax_grid = fig.add_subplot(211)
         self.cv_ax_chart = fig.add_subplot(212)
         self.cv_canvas = FigureCanvasTkAgg(fig, master=right)
         self.cv_canvas.get_tk_widget().pack(fill='both', expand=True)
+        self.cv_render = BlitRenderer(self.cv_canvas, metrics=self.cv_metrics)
 
         self.cv = None
-        self.cv_running = False
-        self.cv_history = []
+        self.cv_img = None
+        self.cv_lines = []
+        self.cv_worker = None
+
+    def _cv_stop(self):
+        worker, self.cv_worker = self.cv_worker, None
+        return self._stop_worker(worker)
 
     def _cv_create(self):
+        self._cv_stop()
         rows = max(5, int(self.cv_rows.get()))
         cols = max(5, int(self.cv_cols.get()))
         init = max(1, int(self.cv_init.get()))
@@ -212,51 +415,68 @@ class SimulacionesApp:
         prec = float(self.cv_prec.get())
         pdie = float(self.cv_pdie.get())
         self.cv = CovidSimulation(rows=rows, cols=cols, init_infected=init, p_infect=pinf, p_recover=prec, p_die=pdie)
-        self.cv_history = [self.cv.counts()]
-        self._cv_draw()
 
-    def _cv_draw(self):
         self.cv_ax_grid.clear()
-        cmap = ListedColormap(['white','lightgreen','red','lightblue','black'])
-        self.cv_ax_grid.imshow(self.cv.grid, interpolation='nearest', cmap=cmap, vmin=0, vmax=4)
-        self.cv_ax_grid.set_title(f'COVID Sim t={self.cv.t}')
-
         self.cv_ax_chart.clear()
-        times = list(range(len(self.cv_history)))
-        s = [h[1] for h in self.cv_history]
-        i = [h[2] for h in self.cv_history]
-        r = [h[3] for h in self.cv_history]
-        d = [h[4] for h in self.cv_history]
-        self.cv_ax_chart.plot(times, s, label='Susceptibles')
-        self.cv_ax_chart.plot(times, i, label='Infectados')
-        self.cv_ax_chart.plot(times, r, label='Recuperados')
-        self.cv_ax_chart.plot(times, d, label='Muertos')
-        self.cv_ax_chart.legend()
-
-        self.cv_canvas.draw()
+        self.cv_render.clear()
+        cmap = ListedColormap(['white','lightgreen','red','lightblue','black'])
+        self.cv_img = self.cv_render.add(self.cv_ax_grid.imshow(self.cv.grid, interpolation='nearest', cmap=cmap, vmin=0, vmax=4))
+        self.cv_render.add(self.cv_ax_grid.title)
+        self.cv_lines = [self.cv_render.add(self.cv_ax_chart.plot([], [], label=label)[0])
+                         for label in ('Susceptibles', 'Infectados', 'Recuperados', 'Muertos')]
+        self.cv_ax_chart.legend(loc='upper right')
+        self.cv_ax_chart.set_ylim(0, rows * cols)
+        self.cv_ax_chart.set_xlim(0, 100)
+        self.cv_render.invalidate()
+        self._cv_draw(self._cv_snapshot(self.cv), force=True)
+
+    @staticmethod
+    def _cv_snapshot(model):
+        # The history only ever appends (a full buffer is replaced, not
+        # overwritten), so its view can be handed over without copying.
+        return {'grid': model.grid.copy(), 't': model.t, 'history': model.history,
+                'steady': model.steady_state()}
+
+    def _cv_apply(self, snap):
+        self.cv_img.set_data(snap['grid'])
+        self.cv_ax_grid.set_title(f'COVID Sim t={snap["t"]}')
+        hist = snap['history']
+        times = np.arange(len(hist))
+        for line, col in zip(self.cv_lines, range(1, 5)):
+            line.set_data(times, hist[:, col])
+        if len(hist) > self.cv_ax_chart.get_xlim()[1]:
+            # The time axis doubles when full; only then is the static
+            # background redrawn.
+            self.cv_ax_chart.set_xlim(0, 2 * len(hist))
+            self.cv_render.invalidate()
+
+    def _cv_draw(self, snap, force=False):
+        self._cv_apply(snap)
+        if self.cv_render.render(force):
+            self._show_status(self.cv_render, self.cv_status, self.cv_panel, snap)
 
     def _cv_step(self):
         if self.cv is None:
             self._cv_create()
-        self.cv.step()
-        self.cv_history.append(self.cv.counts())
-        self._cv_draw()
+        with self._model_lock(self.cv_worker):
+            with self.cv_metrics.timer('step'):
+                self.cv.step()
+            snap = self._cv_snapshot(self.cv)
+        self.cv_render.steps.tick()
+        self._cv_draw(snap, force=True)
 
     def _cv_toggle_run(self):
-        self.cv_running = not self.cv_running
-        if self.cv_running:
-            self._cv_run_loop()
-
-    def _cv_run_loop(self):
-        def loop():
-            while self.cv_running:
-                time.sleep(0.1)
-                try:
-                    self._cv_step()
-                except Exception as e:
-                    print('Error en loop COVID:', e)
-                    self.cv_running = False
-        threading.Thread(target=loop, daemon=True).start()
+        if self.cv_worker is not None and self.cv_worker.alive:
+            snap = self._cv_stop()
+            if snap is not None:
+                self._cv_draw(snap, force=True)
+            return
+        if self.cv is None:
+            self._cv_create()
+        self.cv_worker = SimulationWorker(self.cv, self._cv_snapshot, max_rate=self._max_rate(self.cv_rate),
+                                          until=self._until_steady, metrics=self.cv_metrics).start()
+        self._watch(self.cv_worker, lambda: self.cv_worker, self.cv_render, self._cv_apply,
+                    self.cv_status, self.cv_panel, 'COVID')
 
 def main():
     root = tk.Tk()
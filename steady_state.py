@@ -0,0 +1,100 @@
+from collections import deque
+
+import numpy as np
+
+_WEIGHTS = {}
+
+def _mix(x):
+    # splitmix64 finalizer, in place.  Every input bit affects every output
+    # bit, which a plain weighted sum of the words would not give; 0 maps
+    # to 0.
+    x ^= x >> np.uint64(30)
+    x *= np.uint64(0xBF58476D1CE4E5B9)
+    x ^= x >> np.uint64(27)
+    x *= np.uint64(0x94D049BB133111EB)
+    x ^= x >> np.uint64(31)
+    return x
+
+def state_hash(a):
+    # 64-bit hash of the raw bytes of an array: every 8-byte word is mixed,
+    # then the words are summed with fixed pseudo-random odd weights so the
+    # position of each word counts, wrapping mod 2^64.  An all-zero array
+    # hashes to 0.
+    b = np.ascontiguousarray(a).reshape(-1).view(np.uint8)
+    n = -(-len(b) // 8)
+    w = _WEIGHTS.get(n)
+    if w is None:
+        w = np.random.PCG64(n).random_raw(n) | np.uint64(1)
+        _WEIGHTS[n] = w
+    words = np.zeros(n, dtype=np.uint64)
+    words.view(np.uint8)[:len(b)] = b
+    _mix(words)
+    words *= w
+    return int(words.sum(dtype=np.uint64))
+
+class CycleDetector:
+    # Remembers the hashes of the last `window` states.  A hash seen again
+    # at step t after step t0 means the run entered a cycle of period
+    # t - t0 at t0 (period 1 is a fixed point).  Cycles longer than the
+    # window are not detected.  Deterministic models stay in a cycle once
+    # they reach it, so the first detection is kept until clear().  When
+    # update() is given the state itself, copies of the last `verify`
+    # states are kept and a match with period <= verify is only reported
+    # after comparing the states, not just their hashes.
+    def __init__(self, window=64, verify=8):
+        if window < 1:
+            raise ValueError('window must be >= 1')
+        self.window = window
+        self.verify = verify
+        self.clear()
+
+    def clear(self):
+        self.t = 0
+        self.period = None
+        self.since = None
+        self.extinct_since = None
+        self._seen = {}
+        self._order = deque()
+        self._states = [None] * self.verify
+
+    def update(self, h, extinct=False, state=None):
+        # Records the state at the next step; returns the period or None.
+        t = self.t
+        if extinct and self.extinct_since is None:
+            self.extinct_since = t
+        if self.period is None:
+            prev = self._seen.get(h)
+            if prev is not None and self._confirmed(prev, t, state):
+                self.period = t - prev
+                self.since = prev
+        if state is not None and self.verify:
+            slot = t % self.verify
+            kept = self._states[slot]
+            if kept is None or kept.shape != state.shape or kept.dtype != state.dtype:
+                self._states[slot] = kept = np.empty_like(state)
+            np.copyto(kept, state)
+        self._seen[h] = t
+        self._order.append((h, t))
+        if len(self._order) > self.window:
+            old, told = self._order.popleft()
+            if self._seen.get(old) == told:
+                del self._seen[old]
+        self.t += 1
+        return self.period
+
+    def _confirmed(self, prev, t, state):
+        # The copy of state prev is still in its slot while t - prev <= verify.
+        if state is None or t - prev > self.verify:
+            return True
+        kept = self._states[prev % self.verify]
+        return kept is not None and np.array_equal(kept, state)
+
+    def status(self):
+        # None while the run is still transient, else a dict with kind
+        # ('extinct', 'fixed' or 'cycle'), period and the step it began.
+        if self.extinct_since is not None:
+            return {'kind': 'extinct', 'period': 1, 'since': self.extinct_since}
+        if self.period is None:
+            return None
+        return {'kind': 'fixed' if self.period == 1 else 'cycle',
+                'period': self.period, 'since': self.since}
\ No newline at end of file
@@ -0,0 +1,86 @@
+import json
+import os
+
+import numpy as np
+
+# On-disk layout: <path>.bin holds the raw C-order array data and
+# <path>.json the header (dtype, shape and free-form metadata such as the
+# model parameters and seed).  Arrays grow along their first axis, so a
+# simulation can append one step at a time and the file can be reopened
+# with np.memmap without reading it into memory.
+
+def _paths(path):
+    return path + '.bin', path + '.json'
+
+class ArrayWriter:
+    def __init__(self, path, row_shape=(), dtype=np.float64, **meta):
+        self.path = path
+        self.row_shape = tuple(row_shape)
+        self.dtype = np.dtype(dtype)
+        self.meta = meta
+        self.rows = 0
+        bin_path, _ = _paths(path)
+        os.makedirs(os.path.dirname(os.path.abspath(bin_path)), exist_ok=True)
+        self._f = open(bin_path, 'wb')
+        self._write_header()
+
+    def _write_header(self):
+        _, json_path = _paths(self.path)
+        header = {'dtype': self.dtype.str, 'shape': [self.rows, *self.row_shape], 'meta': self.meta}
+        tmp = json_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(header, f, default=_json_default)
+        os.replace(tmp, json_path)
+
+    def append(self, block):
+        # Accepts one row (shape row_shape) or a block of rows.
+        block = np.ascontiguousarray(block, dtype=self.dtype)
+        if block.shape == self.row_shape:
+            block = block[None]
+        if block.shape[1:] != self.row_shape:
+            raise ValueError(f'expected rows of shape {self.row_shape}, got {block.shape[1:]}')
+        block.tofile(self._f)
+        self.rows += len(block)
+
+    def flush(self):
+        # Makes everything appended so far visible to readers.
+        self._f.flush()
+        self._write_header()
+
+    def close(self):
+        if not self._f.closed:
+            self.flush()
+            self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _json_default(obj):
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f'{type(obj).__name__} is not JSON serializable')
+
+def save_array(path, arr, **meta):
+    arr = np.asarray(arr)
+    if arr.ndim == 0:
+        raise ValueError('cannot save a 0-d array')
+    with ArrayWriter(path, arr.shape[1:], arr.dtype, **meta) as w:
+        w.append(arr)
+
+def read_header(path):
+    with open(_paths(path)[1]) as f:
+        return json.load(f)
+
+def load_array(path, mode='r'):
+    # Returns (array, meta); the array is a memmap, not a copy.
+    header = read_header(path)
+    shape = tuple(header['shape'])
+    dtype = np.dtype(header['dtype'])
+    if 0 in shape:
+        return np.empty(shape, dtype=dtype), header['meta']
+    return np.memmap(_paths(path)[0], dtype=dtype, mode=mode, shape=shape), header['meta']
\ No newline at end of file
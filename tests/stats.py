@@ -0,0 +1,14 @@
+import numpy as np
+
+def ks_statistic(a, b):
+    # Two-sample Kolmogorov-Smirnov statistic sup |F_a - F_b|.
+    a = np.sort(a)
+    b = np.sort(b)
+    grid = np.concatenate([a, b])
+    fa = np.searchsorted(a, grid, side='right') / len(a)
+    fb = np.searchsorted(b, grid, side='right') / len(b)
+    return np.max(np.abs(fa - fb))
+
+def ks_critical(n, m, c=1.95):
+    # c = 1.95 is the 0.1% level; conservative for discrete samples.
+    return c * np.sqrt((n + m) / (n * m))
\ No newline at end of file
@@ -0,0 +1,135 @@
+import numpy as np
+import pytest
+
+from game_of_life_1d import GameOfLife1D, PackedGameOfLife1D
+from game_of_life_2d import GameOfLife2D, parse_rule
+from hashlife import HashLife2D
+
+RULES_2D = ['B3/S23', 'B36/S23', 'B2/S', 'B3678/S34678']
+
+# ---------------- reference implementations ----------------
+# Cell-by-cell loops written after the original GameOfLife2D.step and
+# GameOfLife1D.step, generalized to B/S rules and the wrap boundary.
+
+def reference_step_2d(grid, rule='B3/S23', boundary='clip'):
+    table = parse_rule(rule)
+    rows, cols = grid.shape
+    new = np.zeros_like(grid)
+    for r in range(rows):
+        for c in range(cols):
+            if boundary == 'clip':
+                total = np.sum(grid[max(0, r - 1):r + 2, max(0, c - 1):c + 2]) - grid[r, c]
+            else:
+                total = sum(grid[(r + dr) % rows, (c + dc) % cols]
+                            for dr in (-1, 0, 1) for dc in (-1, 0, 1) if dr or dc)
+            new[r, c] = table[9 * grid[r, c] + total]
+    return new
+
+def reference_step_1d(state, rule):
+    n = len(state)
+    new = np.zeros_like(state)
+    for i in range(n):
+        idx = 4 * state[(i - 1) % n] + 2 * state[i] + state[(i + 1) % n]
+        new[i] = (rule >> int(idx)) & 1
+    return new
+
+def random_board(rows, cols, seed, p=0.35):
+    return (np.random.default_rng(seed).random((rows, cols)) < p).astype(np.uint8)
+
+# ---------------- 2D ----------------
+
+@pytest.mark.parametrize('boundary', ['clip', 'wrap'])
+@pytest.mark.parametrize('rule', RULES_2D)
+def test_dense_matches_reference(boundary, rule):
+    ref = random_board(17, 23, 1)
+    model = GameOfLife2D(17, 23, boundary=boundary, rule=rule)
+    model.grid = ref.copy()
+    for _ in range(6):
+        ref = reference_step_2d(ref, rule, boundary)
+        model.step()
+        np.testing.assert_array_equal(model.grid, ref)
+
+@pytest.mark.parametrize('boundary', ['clip', 'wrap'])
+@pytest.mark.parametrize('rule', RULES_2D)
+@pytest.mark.parametrize('shape, tile_size', [((50, 53), 7), ((64, 64), 16), ((10, 13), 32), ((30, 30), 1)])
+def test_tiled_matches_dense(boundary, rule, shape, tile_size):
+    dense = GameOfLife2D(*shape, boundary=boundary, rule=rule)
+    tiled = GameOfLife2D(*shape, boundary=boundary, rule=rule, tile_size=tile_size)
+    dense.grid = random_board(*shape, 2)
+    tiled.grid = dense.grid.copy()
+    for _ in range(30):
+        dense.step()
+        tiled.step()
+        np.testing.assert_array_equal(tiled.grid, dense.grid)
+
+def test_tiled_picks_up_edits():
+    dense = GameOfLife2D(40, 40, boundary='wrap')
+    tiled = GameOfLife2D(40, 40, boundary='wrap', tile_size=8)
+    dense.grid = random_board(40, 40, 3)
+    tiled.grid = dense.grid.copy()
+    dense.step(5)
+    tiled.step(5)
+    # In-place edit, then whole-grid assignment.
+    dense.grid[0, :] = 1
+    tiled.grid[0, :] = 1
+    tiled.invalidate()
+    dense.step(5)
+    tiled.step(5)
+    np.testing.assert_array_equal(tiled.grid, dense.grid)
+    board = random_board(40, 40, 4)
+    dense.grid = board.copy()
+    tiled.grid = board.copy()
+    dense.step(5)
+    tiled.step(5)
+    np.testing.assert_array_equal(tiled.grid, dense.grid)
+
+@pytest.mark.parametrize('rule', ['B3/S23', 'B36/S23', 'B3678/S34678', 'B2/S'])
+def test_hashlife_matches_dense_inside_window(rule):
+    # HashLife runs on an unbounded plane; a clipped dense board with a
+    # margin wider than the number of generations sees the same window.
+    rows, cols, gens, margin = 24, 20, 12, 16
+    board = random_board(rows, cols, 5)
+    hl = HashLife2D(rows, cols, rule=rule)
+    hl.grid = board
+    dense = GameOfLife2D(rows + 2 * margin, cols + 2 * margin, rule=rule)
+    dense.grid[margin:margin + rows, margin:margin + cols] = board
+    for n in (1, 3, 8):
+        hl.step(n)
+        dense.step(n)
+        np.testing.assert_array_equal(hl.grid, dense.grid[margin:margin + rows, margin:margin + cols])
+    assert hl.generation == gens
+
+def test_hashlife_rejects_b0():
+    with pytest.raises(ValueError):
+        HashLife2D(10, 10, rule='B03/S23')
+
+@pytest.mark.parametrize('rule', ['B3', 'B3/S23/S1', 'B9/S23', 'X3/S23'])
+def test_parse_rule_rejects_invalid(rule):
+    with pytest.raises(ValueError):
+        parse_rule(rule)
+
+# ---------------- 1D ----------------
+
+@pytest.mark.parametrize('cls', [GameOfLife1D, PackedGameOfLife1D])
+@pytest.mark.parametrize('rule', [-1, 256, 300])
+def test_1d_rejects_rule_out_of_range(cls, rule):
+    with pytest.raises(ValueError):
+        cls(10, rule)
+
+@pytest.mark.parametrize('length', [10, 64, 65, 130])
+def test_1d_engines_match_reference_all_rules(length):
+    seed = (np.random.default_rng(length).random(length) < 0.5).astype(np.uint8)
+    for rule in range(256):
+        ref = seed.copy()
+        table = GameOfLife1D(length, rule)
+        packed = PackedGameOfLife1D(length, rule)
+        table.reset(seed)
+        packed.reset(seed)
+        for _ in range(4):
+            ref = reference_step_1d(ref, rule)
+            table.step()
+            packed.step()
+            np.testing.assert_array_equal(table.state, ref, err_msg=f'rule {rule}')
+            np.testing.assert_array_equal(packed.state, ref, err_msg=f'rule {rule}')
+        # run() produces the same diagram in both engines.
+        np.testing.assert_array_equal(packed.run(5), table.run(5), err_msg=f'rule {rule}')
\ No newline at end of file
@@ -0,0 +1,19 @@
+import numpy as np
+import pytest
+
+from covid_ensemble import run_ensemble
+
+PARAMS = dict(rows=15, cols=15, init_infected=4, p_infect=0.4)
+
+def test_rejects_empty_ensemble():
+    with pytest.raises(ValueError, match='n_runs'):
+        run_ensemble(0, 5, seed=1, **PARAMS)
+
+def test_independent_of_workers():
+    one = run_ensemble(5, 8, seed=2, workers=1, **PARAMS)
+    two = run_ensemble(5, 8, seed=2, workers=2, **PARAMS)
+    np.testing.assert_array_equal(one['counts'], two['counts'])
+    assert one['counts'].shape == (5, 9, 5)
+    assert (one['counts'].sum(axis=2) == 225).all()
+    np.testing.assert_allclose(one['mean'], one['counts'].mean(axis=0))
+    assert set(one['quantiles']) == {0.05, 0.5, 0.95}
\ No newline at end of file
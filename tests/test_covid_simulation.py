@@ -0,0 +1,55 @@
+import numpy as np
+
+from covid_simulation import CovidSimulation
+
+def assert_totals_match_grid(model):
+    np.testing.assert_array_equal(model.totals, np.bincount(model.grid.ravel(), minlength=5)[:5])
+
+def test_step_writes_through_non_contiguous_grid():
+    model = CovidSimulation(40, 50, init_infected=10, p_infect=0.5, seed=1)
+    model.grid = np.asfortranarray(model.grid)
+    model.recount()
+    for _ in range(30):
+        model.step()
+        assert_totals_match_grid(model)
+def test_totals_match_grid_after_steps():
+    # A board larger than STEP_BLOCK cells, so step() runs several blocks.
+    model = CovidSimulation(300, 250, init_infected=50, p_infect=0.4, p_recover=0.05, p_die=0.02, seed=2)
+    model.grid[:3] = 0
+    model.recount()
+    for _ in range(40):
+        model.step()
+        assert_totals_match_grid(model)
+    hist = model.history
+    assert hist.shape == (41, 5) and hist.dtype == np.int64
+    np.testing.assert_array_equal(hist[-1], model.totals)
+    assert (hist.sum(axis=1) == model.rows * model.cols).all()
+    assert model.counts() == {k: int(model.totals[k]) for k in range(5)}
+
+def test_death_is_checked_before_recovery():
+    model = CovidSimulation(20, 20, init_infected=30, p_infect=0.0, p_recover=1.0, p_die=1.0, seed=3)
+    infected = model.grid == 2
+    model.step()
+    assert (model.grid[infected] == 4).all()
+    assert model.totals[3] == 0
+    assert model.steady_state() == {'kind': 'extinct', 'period': 1, 'since': 1}
+
+def test_fixed_seed_reproduces_run():
+    runs = []
+    for _ in range(2):
+        model = CovidSimulation(80, 90, init_infected=8, p_infect=0.3, seed=4)
+        for _ in range(25):
+            model.step()
+        runs.append(model)
+    np.testing.assert_array_equal(runs[0].grid, runs[1].grid)
+    np.testing.assert_array_equal(runs[0].history, runs[1].history)
+
+def test_recount_restarts_history():
+    model = CovidSimulation(30, 30, seed=5)
+    for _ in range(5):
+        model.step()
+    model.grid[:] = 1
+    model.recount()
+    assert model.history.shape == (1, 5)
+    assert model.counts() == {0: 0, 1: 900, 2: 0, 3: 0, 4: 0}
+    assert model.steady_state()['since'] == model.t
\ No newline at end of file
@@ -0,0 +1,39 @@
+import numpy as np
+
+import covid_sweep
+from covid_sweep import RunStore, run_key, sweep
+
+def test_sweep_loads_cached_runs(tmp_path, monkeypatch):
+    store = RunStore(str(tmp_path / 'cache'))
+    kwargs = dict(steps=10, seeds=(0, 1), rows=12, cols=12, store=store, workers=1)
+    first = sweep([0.2, 0.4], [0.05], [0.01], **kwargs)
+    assert len(first) == 4
+    for counts in first.values():
+        assert counts.shape == (11, 5)
+        assert (counts.sum(axis=1) == 144).all()
+
+    calls = []
+    real = covid_sweep._simulate
+
+    def counting(params, seed, steps):
+        calls.append(seed)
+        return real(params, seed, steps)
+
+    monkeypatch.setattr(covid_sweep, '_simulate', counting)
+    again = sweep([0.2, 0.4], [0.05], [0.01], **kwargs)
+    assert calls == []
+    for key in first:
+        np.testing.assert_array_equal(again[key], first[key])
+    # Only the new seed is computed.
+    more = sweep([0.2], [0.05], [0.01], **dict(kwargs, seeds=(0, 1, 2)))
+    assert calls == [2]
+    np.testing.assert_array_equal(more[(0.2, 0.05, 0.01, 0)], first[(0.2, 0.05, 0.01, 0)])
+
+def test_run_key_depends_on_parameters_seed_and_steps():
+    params = dict(rows=10, cols=10, init_infected=5, p_infect=0.3, p_recover=0.02, p_die=0.005)
+    key = run_key(params, 0, 50)
+    assert key == run_key(dict(reversed(list(params.items()))), 0, 50)
+    assert key == run_key(dict(params, p_infect=0.3 + 1e-15), 0, 50)
+    assert key != run_key(params, 1, 50)
+    assert key != run_key(params, 0, 51)
+    assert key != run_key(dict(params, p_die=0.006), 0, 50)
\ No newline at end of file
@@ -0,0 +1,125 @@
+import numpy as np
+import pytest
+
+from stats import ks_critical, ks_statistic
+from random_generators import RandomGenerators, RandomStream, _fill_by_rejection
+
+N = 200_000
+
+# (sampler, kwargs, numpy reference drawing `size` samples from the same law)
+CASES = [
+    ('uniform', dict(a=-2.0, b=3.0), lambda rng, size: rng.uniform(-2.0, 3.0, size)),
+    ('exponential', dict(lam=2.5), lambda rng, size: rng.exponential(1 / 2.5, size)),
+    ('erlang', dict(k=3, lam=2.0), lambda rng, size: rng.gamma(3, 1 / 2.0, size)),
+    ('gamma', dict(shape=0.3, scale=2.0), lambda rng, size: rng.gamma(0.3, 2.0, size)),
+    ('gamma', dict(shape=1.0), lambda rng, size: rng.gamma(1.0, 1.0, size)),
+    ('gamma', dict(shape=2.5, scale=0.5), lambda rng, size: rng.gamma(2.5, 0.5, size)),
+    ('gamma', dict(shape=40.0), lambda rng, size: rng.gamma(40.0, 1.0, size)),
+    ('normal', dict(mu=1.5, sigma=3.0), lambda rng, size: rng.normal(1.5, 3.0, size)),
+    ('weibull', dict(k=1.5, lam=2.0), lambda rng, size: 2.0 * rng.weibull(1.5, size)),
+    ('bernoulli', dict(p=0.3), lambda rng, size: rng.binomial(1, 0.3, size)),
+    # Binomial: inversion below n*q = 10, BTRS from 10 on, p > 0.5 reflected.
+    ('binomial', dict(n=20, p=0.3), lambda rng, size: rng.binomial(20, 0.3, size)),
+    ('binomial', dict(n=100, p=0.099), lambda rng, size: rng.binomial(100, 0.099, size)),
+    ('binomial', dict(n=100, p=0.1), lambda rng, size: rng.binomial(100, 0.1, size)),
+    ('binomial', dict(n=1000, p=0.3), lambda rng, size: rng.binomial(1000, 0.3, size)),
+    ('binomial', dict(n=100, p=0.95), lambda rng, size: rng.binomial(100, 0.95, size)),
+    ('binomial', dict(n=1000, p=0.9), lambda rng, size: rng.binomial(1000, 0.9, size)),
+    ('binomial', dict(n=10**7, p=0.4), lambda rng, size: rng.binomial(10**7, 0.4, size)),
+    # Poisson: inversion below lam = 10, PTRS from 10 on.
+    ('poisson', dict(lam=0.5), lambda rng, size: rng.poisson(0.5, size)),
+    ('poisson', dict(lam=9.9), lambda rng, size: rng.poisson(9.9, size)),
+    ('poisson', dict(lam=10.0), lambda rng, size: rng.poisson(10.0, size)),
+    ('poisson', dict(lam=250.0), lambda rng, size: rng.poisson(250.0, size)),
+    ('poisson', dict(lam=1e9), lambda rng, size: rng.poisson(1e9, size)),
+]
+
+def _ids(case):
+    return case[0] + '-' + '-'.join(f'{k}={v}' for k, v in case[1].items())
+
+@pytest.mark.parametrize('dist, kwargs, reference', CASES, ids=[_ids(c) for c in CASES])
+def test_matches_numpy_reference(dist, kwargs, reference):
+    x = np.asarray(getattr(RandomGenerators, dist)(size=N, rng=np.random.default_rng(1), **kwargs), dtype=float)
+    y = np.asarray(reference(np.random.default_rng(2), N), dtype=float)
+    assert len(x) == N
+    # Mean and variance within 5 standard errors of the reference sample.
+    var = y.var()
+    assert abs(x.mean() - y.mean()) <= 5 * np.sqrt(2 * var / N) + 1e-12
+    m4 = np.mean((y - y.mean()) ** 4)
+    assert abs(x.var() - var) <= 5 * np.sqrt(2 * max(m4 - var ** 2, 0) / N) + 1e-12
+    assert ks_statistic(x, y) < ks_critical(N, N)
+
+@pytest.mark.parametrize('kwargs, expected', [
+    (dict(n=0, p=0.4), 0),
+    (dict(n=25, p=0.0), 0),
+    (dict(n=25, p=1.0), 25),
+])
+def test_binomial_degenerate(kwargs, expected):
+    out = RandomGenerators.binomial(size=1000, rng=np.random.default_rng(0), **kwargs)
+    assert out.shape == (1000,)
+    assert (out == expected).all()
+
+def test_integer_samplers_return_integers():
+    rng = np.random.default_rng(0)
+    for out in (RandomGenerators.binomial(n=1000, p=0.3, size=100, rng=rng),
+                RandomGenerators.binomial(n=20, p=0.3, size=100, rng=rng),
+                RandomGenerators.poisson(lam=50.0, size=100, rng=rng),
+                RandomGenerators.poisson(lam=2.0, size=100, rng=rng)):
+        assert np.issubdtype(out.dtype, np.integer)
+
+def test_invalid_parameters():
+    with pytest.raises(ValueError):
+        RandomGenerators.gamma(shape=0.0)
+    with pytest.raises(ValueError):
+        RandomGenerators.binomial(n=10, p=1.5)
+    with pytest.raises(ValueError):
+        RandomGenerators.poisson(lam=-1.0)
+    with pytest.raises(ValueError):
+        RandomGenerators.erlang(k=0)
+    for dist in ('seed', 'generate_parallel', '_btrs'):
+        with pytest.raises(ValueError):
+            RandomGenerators.generate_parallel(dist, 10)
+
+def test_fill_by_rejection_refills_until_full():
+    # Claims a 100% acceptance rate but accepts about 10%, so the output
+    # is only complete after several refill rounds.
+    rng = np.random.default_rng(3)
+    calls = []
+
+    def propose(m):
+        calls.append(m)
+        u = rng.random(m)
+        return u[u < 0.1]
+
+    out = _fill_by_rejection(50_000, propose, rate=1.0)
+    assert len(out) == 50_000
+    assert len(calls) > 5
+    # Accepted values are U(0, 0.1).
+    ref = np.random.default_rng(4).uniform(0, 0.1, 50_000)
+    assert ks_statistic(out, ref) < ks_critical(50_000, 50_000)
+
+def test_samplers_are_reproducible_with_rng():
+    for dist, kwargs, _ in CASES:
+        a = getattr(RandomGenerators, dist)(size=1000, rng=np.random.default_rng(7), **kwargs)
+        b = getattr(RandomGenerators, dist)(size=1000, rng=np.random.default_rng(7), **kwargs)
+        np.testing.assert_array_equal(a, b)
+
+@pytest.mark.parametrize('dist, params', [
+    ('normal', {}),
+    ('gamma', {'shape': 0.7}),
+    ('poisson', {'lam': 50.0}),
+    ('binomial', {'n': 30, 'p': 0.2}),
+])
+def test_generate_parallel_independent_of_workers(dist, params):
+    runs = [RandomGenerators.generate_parallel(dist, 100_003, params, workers=w, seed=11, chunk_size=10_000)
+            for w in (1, 2, 4)]
+    for out in runs[1:]:
+        np.testing.assert_array_equal(runs[0], out)
+    assert len(runs[0]) == 100_003
+
+def test_generate_parallel_chunks_use_child_streams():
+    stream = RandomStream(5)
+    out = RandomGenerators.generate_parallel('uniform', 25, workers=3, seed=stream, chunk_size=10)
+    expected = np.concatenate([RandomGenerators.uniform(size=n, rng=RandomStream(5).child(i))
+                               for i, n in enumerate((10, 10, 5))])
+    np.testing.assert_array_equal(out, expected)
\ No newline at end of file
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from random_generators import RandomGenerators
+from sample_stream import StreamingStats, iter_chunks
+
+@pytest.mark.parametrize('dist, params', [
+    ('normal', dict(mu=3.0, sigma=2.0)),
+    ('exponential', dict(lam=0.5)),
+    ('poisson', dict(lam=4.0)),
+    ('binomial', dict(n=1000, p=0.3)),
+])
+@pytest.mark.parametrize('chunk_size', [1, 999, 1 << 20])
+def test_streaming_stats_match_full_array(dist, params, chunk_size):
+    n = 5_000 if chunk_size == 1 else 200_000
+    full = RandomGenerators.generate_parallel(dist, n, params, workers=1, seed=3, chunk_size=chunk_size)
+    st = StreamingStats(bins=40)
+    for chunk in iter_chunks(dist, n, params, chunk_size=chunk_size, seed=3):
+        st.update(chunk)
+    assert st.count == n
+    assert st.mean == pytest.approx(full.mean(), rel=1e-9, abs=1e-12)
+    assert st.variance == pytest.approx(full.var(), rel=1e-9)
+    assert st.min == full.min() and st.max == full.max()
+    assert st.hist.sum() + st.outside == n
+
+def test_histogram_matches_numpy_with_fixed_edges():
+    data = np.random.default_rng(0).normal(size=50_000)
+    edges = np.linspace(-2, 2, 21)
+    st = StreamingStats(edges=edges)
+    for chunk in np.array_split(data, 7):
+        st.update(chunk)
+    np.testing.assert_array_equal(st.hist, np.histogram(data, bins=edges)[0])
+    assert st.underflow == np.count_nonzero(data < -2)
+    assert st.overflow == np.count_nonzero(data > 2)
+    assert (st.density() * np.diff(edges)).sum() == pytest.approx(st.hist.sum() / len(data))
+
+def test_pilot_edges_cover_later_chunks():
+    # Edges fitted to the first small chunk miss the tail; a pilot sample
+    # catches (almost) all of it.
+    chunks = list(iter_chunks('exponential', 1_000_000, dict(lam=1.0), chunk_size=1000, seed=5))
+    first = StreamingStats(bins=100)
+    piloted = StreamingStats(bins=100)
+    piloted.fit_edges(RandomGenerators.exponential(lam=1.0, size=100_000, rng=np.random.default_rng(6)))
+    for chunk in chunks:
+        first.update(chunk)
+        piloted.update(chunk)
+    assert first.outside > 100
+    assert piloted.outside < first.outside / 10
+
+def test_integer_edges_one_bin_per_value():
+    st = StreamingStats()
+    st.fit_edges(np.array([2, 5, 3], dtype=np.int64))
+    np.testing.assert_array_equal(st.edges, np.arange(1.5, 6.0))
+
+def test_quantile_sketch():
+    data = np.random.default_rng(1).random(300_000)
+    st = StreamingStats(reservoir=20_000, seed=0)
+    for chunk in np.array_split(data, 30):
+        st.update(chunk)
+    for q in (0.1, 0.5, 0.9):
+        assert st.quantile(q) == pytest.approx(q, abs=0.02)
\ No newline at end of file
@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+
+from game_of_life_1d import GameOfLife1D, PackedGameOfLife1D
+from game_of_life_2d import GameOfLife2D
+from steady_state import CycleDetector, state_hash
+
+def board_2d(cells, shape=(8, 8), **kwargs):
+    model = GameOfLife2D(*shape, cycle_window=16, **kwargs)
+    for r, c in cells:
+        model.grid[r, c] = 1
+    model.cycles.clear()
+    return model
+
+# ---------------- through the models ----------------
+
+@pytest.mark.parametrize('tile_size', [None, 3])
+def test_2d_blinker_is_period_2(tile_size):
+    model = board_2d([(3, 2), (3, 3), (3, 4)], tile_size=tile_size)
+    model.step(4)
+    assert model.steady_state() == {'kind': 'cycle', 'period': 2, 'since': 0}
+
+def test_2d_block_is_fixed_point():
+    model = board_2d([(2, 2), (2, 3), (3, 2), (3, 3)])
+    model.step(3)
+    assert model.steady_state() == {'kind': 'fixed', 'period': 1, 'since': 0}
+
+def test_2d_extinction():
+    model = board_2d([(4, 4)])
+    model.step()
+    assert model.steady_state() == {'kind': 'extinct', 'period': 1, 'since': 1}
+    empty = board_2d([])
+    empty.step()
+    assert empty.steady_state()['since'] == 0
+
+def test_2d_transient_has_no_steady_state():
+    model = board_2d([(0, 1), (1, 2), (2, 0), (2, 1), (2, 2)], shape=(40, 40))
+    model.step(10)
+    assert model.steady_state() is None
+
+@pytest.mark.parametrize('cls', [GameOfLife1D, PackedGameOfLife1D])
+@pytest.mark.parametrize('rule, kind, period, since', [
+    (204, 'fixed', 1, 0),     # identity
+    (51, 'cycle', 2, 0),      # complement
+    (0, 'extinct', 1, 1),
+])
+def test_1d_steady_states(cls, rule, kind, period, since):
+    model = cls(70, rule, cycle_window=16)
+    model.run(5)
+    assert model.steady_state() == {'kind': kind, 'period': period, 'since': since}
+
+def test_packed_shift_rule_reports_true_period():
+    # Rule 170 shifts the row by one cell, so a random row of 128 cells
+    # returns after exactly 128 steps.
+    seed = np.random.default_rng(0).random(128) < 0.5
+    model = PackedGameOfLife1D(128, 170, cycle_window=64)
+    model.reset(seed)
+    model.run(200)
+    assert model.steady_state() is None
+    model = PackedGameOfLife1D(128, 170, cycle_window=256)
+    model.reset(seed)
+    model.run(200)
+    assert model.steady_state() == {'kind': 'cycle', 'period': 128, 'since': 0}
+
+def test_state_hash_zero_and_shifts():
+    assert state_hash(np.zeros(37, dtype=np.uint8)) == 0
+    row = np.random.default_rng(1).random(1024) < 0.5
+    hashes = {state_hash(np.packbits(np.roll(row, k))) for k in range(1024)}
+    assert len(hashes) == 1024
+
+# ---------------- CycleDetector ----------------
+
+def test_window_evicts_old_states():
+    short = CycleDetector(window=3)
+    long = CycleDetector(window=4)
+    for h in (1, 2, 3, 4, 1):
+        short.update(h)
+        long.update(h)
+    assert short.status() is None
+    assert long.status() == {'kind': 'cycle', 'period': 4, 'since': 0}
+
+def test_first_detection_is_kept_until_clear():
+    d = CycleDetector(window=8)
+    for h in (1, 2, 1, 1, 1):
+        d.update(h)
+    assert d.status() == {'kind': 'cycle', 'period': 2, 'since': 0}
+    d.clear()
+    assert d.status() is None and d.t == 0
+
+def test_verify_rejects_hash_collision():
+    d = CycleDetector(window=8, verify=4)
+    d.update(5, state=np.array([1], dtype=np.uint8))
+    # Same hash, different state: not a fixed point.
+    assert d.update(5, state=np.array([2], dtype=np.uint8)) is None
+    # Same hash and state as the previous step: a real fixed point.
+    assert d.update(5, state=np.array([2], dtype=np.uint8)) == 1
+    assert d.status() == {'kind': 'fixed', 'period': 1, 'since': 1}
+
+def test_verify_trusts_hash_beyond_kept_states():
+    d = CycleDetector(window=8, verify=2)
+    for k, h in enumerate((7, 8, 9, 7)):
+        d.update(h, state=np.array([k], dtype=np.uint8))
+    assert d.status() == {'kind': 'cycle', 'period': 3, 'since': 0}
\ No newline at end of file
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from storage import ArrayWriter, load_array, read_header, save_array
+
+def test_save_load_round_trip(tmp_path):
+    path = str(tmp_path / 'runs' / 'grid')
+    arr = np.random.default_rng(0).integers(0, 5, size=(7, 3, 4), dtype=np.uint8)
+    save_array(path, arr, model='covid', seed=np.int64(3), p=np.float32(0.5))
+    out, meta = load_array(path)
+    assert isinstance(out, np.memmap)
+    assert out.dtype == np.uint8 and out.shape == (7, 3, 4)
+    np.testing.assert_array_equal(out, arr)
+    assert meta == {'model': 'covid', 'seed': 3, 'p': 0.5}
+
+def test_append_is_visible_after_flush(tmp_path):
+    path = str(tmp_path / 'samples')
+    with ArrayWriter(path, (2,), np.float64, dist='normal') as w:
+        w.append([1.0, 2.0])
+        w.append(np.arange(6.0).reshape(3, 2))
+        assert read_header(path)['shape'] == [0, 2]
+        w.flush()
+        out, _ = load_array(path)
+        np.testing.assert_array_equal(out, [[1, 2], [0, 1], [2, 3], [4, 5]])
+        w.append(np.zeros((0, 2)))
+        w.append([9.0, 9.0])
+    out, meta = load_array(path)
+    assert out.shape == (5, 2) and meta == {'dist': 'normal'}
+    np.testing.assert_array_equal(out[-1], [9, 9])
+
+def test_empty_arrays(tmp_path):
+    path = str(tmp_path / 'empty')
+    save_array(path, np.zeros((0, 4), dtype=np.int32))
+    out, _ = load_array(path)
+    assert out.shape == (0, 4) and out.dtype == np.int32
+    with ArrayWriter(path, (), np.uint8):
+        pass
+    out, _ = load_array(path)
+    assert out.shape == (0,)
+
+def test_invalid_arrays(tmp_path):
+    with pytest.raises(ValueError):
+        save_array(str(tmp_path / 'scalar'), np.float64(1.0))
+    with ArrayWriter(str(tmp_path / 'rows'), (3,)) as w:
+        with pytest.raises(ValueError):
+            w.append(np.zeros((2, 4)))
\ No newline at end of file